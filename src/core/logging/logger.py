@@ -1,8 +1,11 @@
 """
 日志记录模块，提供统一的日志记录功能
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from pathlib import Path
 from src.core.config.config import DATA_DIR
 from datetime import datetime
@@ -33,30 +36,38 @@ class Logger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
         
         # 文件处理器
         log_file = os.path.join(log_dir, f"redbook_mcp_{datetime.now().strftime('%Y%m%d')}.log")
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        
+        # 记录只在调用方入队，控制台/文件写入由后台监听线程完成，不阻塞事件循环
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        # 退出时停止监听线程，确保队列中剩余的日志被写出
+        atexit.register(self._listener.stop)
     
-    def info(self, message: str):
-        """记录信息级别日志"""
-        self.logger.info(message)
+    def info(self, message: str, *args):
+        """记录信息级别日志（args 非空时按 % 格式延迟格式化）"""
+        self.logger.info(message, *args)
     
-    def error(self, message: str):
-        """记录错误级别日志"""
-        self.logger.error(message)
+    def error(self, message: str, *args):
+        """记录错误级别日志（args 非空时按 % 格式延迟格式化）"""
+        self.logger.error(message, *args)
     
-    def warning(self, message: str):
-        """记录警告级别日志"""
-        self.logger.warning(message)
+    def warning(self, message: str, *args):
+        """记录警告级别日志（args 非空时按 % 格式延迟格式化）"""
+        self.logger.warning(message, *args)
     
-    def debug(self, message: str):
-        """记录调试级别日志"""
-        self.logger.debug(message)
+    def debug(self, message: str, *args):
+        """记录调试级别日志（args 非空时按 % 格式延迟格式化）"""
+        self.logger.debug(message, *args)
 
 # 创建全局日志实例
 logger = Logger() 
\ No newline at end of file
@@ -2,21 +2,666 @@
 发布相关功能模块，包括发布图文笔记等
 """
 import asyncio
+import json
 import os
-from typing import List, Optional
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple, Union
 import re
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError, expect
+from src.core.config.config import config
+from src.core.logging.logger import logger
+
+# 小红书创作服务平台发布页
+_PUBLISH_URL = "https://creator.xiaohongshu.com/publish/publish?source=official&from=tab_switch"
+
+# 话题规范化：去掉首尾空白和用户自带的#前缀
+_HASHTAG_RE = re.compile(r'^\s*#*\s*([^\s#].*?)\s*$')
+
+# 视频上传完成接口（响应200即表示服务端已收到完整文件）
+_UPLOAD_COMPLETE_PATH = "/api/media/upload/complete"
+
+# 并发发布时同时打开的标签页上限（与浏览器对同一主机的并发连接数一致）
+_MAX_PARALLEL_PAGES = 6
+
+# 调试模式：开启后在慢速上传路径保存页面截图
+_DEBUG = os.getenv("REDBOOK_MCP_DEBUG") == "1"
+
+# 支持的媒体文件扩展名
+VIDEO_EXTS = {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.mkv', '.webm', '.m4v'}
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff'}
+
+# 扩展名 -> 媒体类型，一次字典查找完成分类
+_EXT_KIND = {ext: "video" for ext in VIDEO_EXTS}
+_EXT_KIND.update({ext: "image" for ext in IMAGE_EXTS})
+
+def _union(*selectors: str) -> str:
+    """把候选选择器拼接为逗号并集，按首次出现的顺序去重
+
+    Args:
+        *selectors (str): 候选CSS/Playwright选择器
+
+    Returns:
+        str: 逗号分隔的选择器并集
+    """
+    return ",".join(dict.fromkeys(selectors))
+
+
+# 逻辑元素 -> 选择器并集，导入时拼接一次，Playwright一次协议调用即可匹配全部候选
+_SELECTOR_UNIONS = {
+    "video_tab": _union(
+        ':text-is("上传视频")',
+        'div[data-testid="video-tab"]',
+        'button:has-text("视频")',
+        '.tab-video',
+        '[role="tab"]:has-text("视频")',
+    ),
+    "image_tab": ':text-is("上传图文")',
+    "file_input": 'input[type="file"]',
+    "video_file_input": 'input[type="file"][accept*="video"]',
+    "title": _union(
+        'input[placeholder*="标题"]',
+        'textarea[placeholder*="标题"]',
+    ),
+    "content": _union(
+        'div[contenteditable="true"]',
+        'textarea[placeholder*="输入正文"]',
+        '[role="textbox"]',
+    ),
+    "immediate_publish": ':text-is("立即发布")',
+    "publish": _union(
+        'button:has-text("发布")',  # has-text为子串匹配，已覆盖“发布笔记”
+        '[aria-label="发布"]',
+    ),
+    # 话题下拉建议项（只用于等待下拉出现/消失，不包含过于宽泛的选择器）
+    "topic_suggestion": _union(
+        'div[class*="topic"] div[class*="item"]',
+        'div[class*="suggestion"] div[class*="item"]',
+        '.el-autocomplete-suggestion li',
+        'div[role="option"]',
+        'li[role="option"]',
+        '.topic-dropdown .topic-option',
+        '.hashtag-dropdown .hashtag-option',
+    ),
+    # 图片上传完成后出现的预览/成功标识
+    "upload_done": _union(
+        'div[class*="upload-success"]',
+        'img.uploaded-thumb',
+        '.preview-item',
+    ),
+    # 视频上传完成后的成功标识/进度条满格
+    "video_upload_done": _union(
+        'div.upload-success',
+        '.progress[data-percent="100"]',
+        '[data-upload="complete"]',
+    ),
+    # 发布后的成功/失败提示（:text 为子串匹配，同时覆盖“笔记发布成功”）
+    "publish_result": _union(
+        ':text("发布成功")',
+        'div[class*="success-toast"]',
+        '.error-message',
+        '.toast-message',
+    ),
+}
+
+# 发布页表单是否为空：没有已上传的预览，标题和正文输入框都没有内容（批量发布复用发布页前检查，避免叠加上一篇的残留）
+_FORM_EMPTY_JS = """
+({ previews, fields }) => {
+    if (document.querySelector(previews)) {
+        return false;
+    }
+    return Array.from(document.querySelectorAll(fields)).every(el => {
+        const text = el.value !== undefined ? el.value : el.textContent;
+        return !(text || '').trim();
+    });
+}
+"""
+_FORM_EMPTY_ARG = {
+    "previews": _union(_SELECTOR_UNIONS["upload_done"], _SELECTOR_UNIONS["video_upload_done"]),
+    "fields": _union(_SELECTOR_UNIONS["title"], _SELECTOR_UNIONS["content"]),
+}
+
+# 按文本一次性定位并点击模式标签（取最内层的匹配元素，保证点击落在实际绑定事件的节点上），返回是否点击成功
+_MODE_TAB_CLICK_JS = """
+(text) => {
+    const matches = Array.from(document.querySelectorAll('button, [role="tab"], div, span'))
+        .filter(el => el.textContent && el.textContent.trim() === text);
+    const tab = matches.find(el => !matches.some(other => other !== el && el.contains(other)));
+    if (!tab) {
+        return false;
+    }
+    tab.click();
+    return true;
+}
+"""
+
+# 在页面内用MutationObserver等待话题下拉出现，出现即返回true，超时返回false（一次协议调用，不轮询）
+_WAIT_SUGGESTION_JS = """
+({ selector, ms }) => new Promise(resolve => {
+    const visible = () => {
+        const el = document.querySelector(selector);
+        return !!(el && el.offsetParent);
+    };
+    if (visible()) {
+        resolve(true);
+        return;
+    }
+    const observer = new MutationObserver(() => {
+        if (visible()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(true);
+        }
+    });
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        resolve(false);
+    }, ms);
+    observer.observe(document.body, { childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class'] });
+})
+"""
+
+# 话题下拉建议项的候选选择器（取第一个可见的建议项）；
+# 通过 Locator.or_ 组合为一次查询，不含“ul li”这类会命中页面导航菜单的通用选择器，兜底交给JS查找
+_SUGGESTION_SELECTORS = (
+    # 基于截图中的结构，话题建议可能在这些容器中
+    'div[class*="topic"] div[class*="item"]:first-child',
+    'div[class*="suggestion"] div[class*="item"]:first-child',
+    '.topic-suggestion-list .topic-item:first-child',
+    '.suggestion-dropdown .suggestion-item:first-child',
+    # Element UI 相关选择器
+    '.el-select-dropdown__item:first-child',
+    '.el-autocomplete-suggestion__list li:first-child',
+    '.el-autocomplete-suggestion li:first-child',
+    # 通用的下拉列表选择器
+    'div[role="option"]:first-child',
+    'li[role="option"]:first-child',
+    # 可能的话题容器
+    '.topic-dropdown .topic-option:first-child',
+    '.hashtag-dropdown .hashtag-option:first-child',
+)
+
+# 各媒体类型可直接设置文件的输入元素（_SELECTOR_UNIONS中的键），按优先级排列
+_DIRECT_INPUT_KEYS = {
+    "image": ("file_input",),
+    "video": ("video_file_input", "file_input"),
+}
+
+# 没有文件输入元素时，用于触发文件选择器的上传按钮
+_UPLOAD_TRIGGER_SELECTORS = {
+    "image": (
+        'button.el-button--danger',  # 红色按钮类
+        '.el-button--danger',        # 红色按钮类
+        'button.upload-btn',         # 上传按钮
+        '.upload-image-btn',         # 上传图片按钮
+        'button.upload-image-btn',   # 上传图片按钮
+        '.upload-btn',               # 上传按钮
+        'button:has-text("上传图片")',  # 文本匹配
+        '.el-upload button',         # Element UI上传组件的按钮
+        '.upload-area button',       # 上传区域中的按钮
+        '.upload-btn--primary',      # 主要上传按钮
+        '.upload-container button',  # 上传容器中的按钮
+    ),
+    "video": (
+        'button:has-text("上传视频")',          # 上传视频按钮
+        'button:has-text("选择视频")',          # 选择视频按钮
+        '.video-upload-btn',                   # 视频上传按钮类
+        '.upload-video-btn',                   # 上传视频按钮类
+        '.el-upload button',                   # Element UI上传组件的按钮
+        '.upload-area',                        # 上传区域
+        '.video-upload-area',                  # 视频上传区域
+    ),
+}
+
+# 通过文本查找视频上传按钮或上传区域，并加边框标记；click为true时直接点击找到的元素（省去一次往返）
+_VIDEO_UPLOAD_FIND_JS = """
+(click) => {
+    // 查找包含"上传视频"、"选择视频"等文本的按钮（先限定在上传区域内查找）
+    const isVideoUploadBtn = el => 
+        el.textContent && (
+            el.textContent.includes('上传视频') ||
+            el.textContent.includes('选择视频') ||
+            el.textContent.includes('添加视频')
+        );
+    const uploadRoot = document.querySelector('.upload-wrapper, .upload-container, [class*="upload"]');
+    const videoUploadBtn =
+        (uploadRoot && Array.from(uploadRoot.querySelectorAll('button, a, div, span')).find(isVideoUploadBtn)) ||
+        Array.from(document.querySelectorAll('button, a, div, span')).find(isVideoUploadBtn);
+    
+    if (videoUploadBtn) {
+        videoUploadBtn.style.border = '5px solid green';
+        if (click) videoUploadBtn.click();
+        return {
+            found: true,
+            method: 'text',
+            tag: videoUploadBtn.tagName,
+            text: videoUploadBtn.textContent.trim()
+        };
+    }
+    
+    // 查找上传区域
+    const uploadAreas = Array.from(document.querySelectorAll('.upload-area, .el-upload, [class*="upload"]'));
+    if (uploadAreas.length > 0) {
+        uploadAreas[0].style.border = '5px solid yellow';
+        if (click) uploadAreas[0].click();
+        return {
+            found: true,
+            method: 'area',
+            tag: uploadAreas[0].tagName,
+            classes: uploadAreas[0].className
+        };
+    }
+    
+    return { found: false };
+}
+"""
+
+# 话题建议点击脚本：话题通过参数传入，脚本只需编译一次，也避免拼接字符串带来的注入问题
+_TOPIC_CLICK_JS = """
+(topic) => {
+    // 优先在话题下拉容器内查找，只有找不到容器时才退回全文档扫描
+    const container = document.querySelector(
+        '.el-autocomplete-suggestion, [class*="topic-suggestion"], [class*="suggestion"], ' +
+        '[class*="topic-dropdown"], [class*="hashtag-dropdown"], [role="listbox"]'
+    );
+    const allElements = Array.from((container || document).querySelectorAll('li, div, span, a'));
+    
+    // 寻找包含当前话题关键词的建议项
+    const topicText = '#' + topic;
+    const suggestionItems = allElements.filter(el => {
+        const text = el.textContent;
+        return text && (
+            text.includes(topicText) ||
+            text.includes(topic) ||
+            text.includes('次浏览')
+        );
+    });
+    
+    if (suggestionItems.length > 0) {
+        // 优先选择完全匹配的项
+        let targetItem = suggestionItems.find(el => 
+            el.textContent.includes(topicText)
+        );
+        
+        // 如果没有完全匹配，选择第一个相关项
+        if (!targetItem) {
+            targetItem = suggestionItems[0];
+        }
+        
+        // 高亮并点击
+        targetItem.style.border = '3px solid red';
+        targetItem.click();
+        
+        return {
+            success: true,
+            text: targetItem.textContent.trim(),
+            found: suggestionItems.length
+        };
+    }
+    
+    return { success: false, found: 0 };
+}
+"""
+
+# 视频上传完成信号：页面内MutationObserver监听完成标识出现，出现即resolve(true)，超时resolve(false)；
+# 只在发布页上按需evaluate（不挂到window上，避免留下可被检测的全局变量），等待期间只有一次协议往返，不在Python侧轮询
+_UPLOAD_READY_JS = """
+({ selector, ms }) => new Promise(resolve => {
+    if (document.querySelector(selector)) {
+        resolve(true);
+        return;
+    }
+    const observer = new MutationObserver(() => {
+        if (document.querySelector(selector)) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(true);
+        }
+    });
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        resolve(false);
+    }, ms);
+    observer.observe(document.body, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['class', 'data-percent', 'data-upload'],
+    });
+})
+"""
+
+# 探测Element UI自动补全组件实例是否可用
+_VUE_AUTOCOMPLETE_PROBE_JS = """
+() => {
+    const el = document.querySelector('.el-autocomplete');
+    return !!(el && el.__vue__ && typeof el.__vue__.select === 'function');
+}
+"""
+
+# 通过组件实例直接选择第一个话题建议，返回是否成功
+_VUE_TOPIC_SELECT_JS = """
+() => {
+    const el = document.querySelector('.el-autocomplete');
+    const vm = el && el.__vue__;
+    if (!vm || typeof vm.select !== 'function' || !vm.suggestions || vm.suggestions.length === 0) {
+        return false;
+    }
+    vm.select(vm.suggestions[0]);
+    return true;
+}
+"""
+
+# 一次性插入正文和全部话题标签；若编辑器未能把话题识别为标签，则删除刚插入的话题文本，交给逐个话题流程处理
+_BATCH_INSERT_JS = """
+(el, { content, topics }) => {
+    el.focus();
+    const isField = el.tagName === 'TEXTAREA' || el.tagName === 'INPUT';
+    const insert = (text) => {
+        if (!text) return;
+        if (!document.execCommand('insertText', false, text) && isField) {
+            el.setRangeText(text, el.selectionStart, el.selectionEnd, 'end');
+            el.dispatchEvent(new InputEvent('input', { inputType: 'insertText', data: text, bubbles: true }));
+        }
+    };
+    
+    // execCommand在富文本编辑器上可能返回false且不插入任何内容，按文本是否变化判断正文是否真正写入
+    const textOf = () => (isField ? el.value : el.textContent) || '';
+    const textBefore = textOf();
+    insert(topics.length ? content + '\\n\\n' : content);
+    if (content && textOf() === textBefore) {
+        return { inserted: false, topicsTagged: false };
+    }
+    if (!topics.length) {
+        return { inserted: true, topicsTagged: true };
+    }
+    
+    const tagSelector = '[data-topic], .tiptap-topic, [class*="topic-tag"], a[class*="topic"]';
+    const before = el.querySelectorAll(tagSelector).length;
+    const tagText = topics.map(t => `#${t}`).join(' ');
+    // 记录话题插入前的光标位置，撤回时按区间删除（不按字符数回退，避免表情等多码元字符删错）
+    const sel = window.getSelection();
+    const fieldStart = isField ? el.selectionStart : null;
+    const rangeStart = !isField && sel.rangeCount ? sel.getRangeAt(0).cloneRange() : null;
+    insert(tagText);
+    if (el.querySelectorAll(tagSelector).length - before >= topics.length) {
+        return { inserted: true, topicsTagged: true };
+    }
+    
+    // 话题未被标签化：撤回纯文本话题
+    if (isField) {
+        el.setRangeText('', fieldStart, el.selectionStart, 'end');
+        el.dispatchEvent(new InputEvent('input', { inputType: 'deleteContentBackward', bubbles: true }));
+    } else if (rangeStart && sel.rangeCount && el.contains(rangeStart.startContainer)) {
+        const caret = sel.getRangeAt(0);
+        const range = document.createRange();
+        range.setStart(rangeStart.startContainer, rangeStart.startOffset);
+        range.setEnd(caret.endContainer, caret.endOffset);
+        sel.removeAllRanges();
+        sel.addRange(range);
+        document.execCommand('delete');
+    }
+    return { inserted: true, topicsTagged: false };
+}
+"""
+
+
+def _validate_paths(media_paths: List[str]) -> Tuple[bool, bool, Optional[str], Dict[str, os.stat_result]]:
+    """同步检查媒体文件是否存在并分类（在线程池中执行，避免阻塞事件循环）
+
+    Args:
+        media_paths (List[str]): 媒体文件路径列表
+
+    Returns:
+        Tuple[bool, bool, Optional[str], Dict[str, os.stat_result]]: (是否包含视频, 是否包含图片, 错误信息, 各文件的stat结果)
+    """
+    kinds = set()
+    stats = {}
+
+    # 先只按扩展名分类（不触发系统调用），不支持的类型立即失败
+    for media_path in media_paths:
+        file_ext = "." + media_path.rpartition(".")[2].lower()
+        kind = _EXT_KIND.get(file_ext)
+        if kind is None:
+            return "video" in kinds, "image" in kinds, f"不支持的文件类型: {file_ext}", stats
+        kinds.add(kind)
+
+    # 按目录分组：同一目录下有多个文件时用一次scandir取得全部stat，单个文件直接stat
+    groups = defaultdict(dict)
+    for media_path in media_paths:
+        groups[os.path.dirname(media_path) or "."][os.path.basename(media_path)] = media_path
+
+    for directory, wanted in groups.items():
+        if len(wanted) > 1:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        media_path = wanted.get(entry.name)
+                        if media_path is None:
+                            continue
+                        try:
+                            stats[media_path] = entry.stat()
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+
+        # scandir未精确匹配的文件（如大小写不敏感的文件系统上大小写不同的文件名）和单个文件直接stat
+        for media_path in wanted.values():
+            if media_path in stats:
+                continue
+            try:
+                stats[media_path] = os.stat(media_path)
+            except OSError:
+                pass
+
+    # 按原始顺序报告第一个缺失的文件
+    for media_path in media_paths:
+        if media_path not in stats:
+            return "video" in kinds, "image" in kinds, f"媒体文件不存在: {media_path}", stats
+
+    return "video" in kinds, "image" in kinds, None, stats
+
+
+class _PageScope:
+    """把共享上下文中的一个额外标签页包装成PublishManager所需的浏览器接口，供并发发布使用"""
+    
+    def __init__(self, browser_manager, page):
+        """初始化标签页作用域
+        
+        Args:
+            browser_manager: 浏览器管理器实例（提供共享的浏览器上下文）
+            page: 该作用域独占的标签页
+        """
+        self._browser = browser_manager
+        self.main_page = page
+    
+    @property
+    def browser_context(self):
+        """共享的浏览器上下文（登录态随上下文共享）"""
+        return self._browser.browser_context
+    
+    async def goto(self, url, wait_time=5):
+        """在独占的标签页中访问指定URL（复用浏览器管理器的重试、登录弹窗处理和反检测校验）
+        
+        Args:
+            url: 目标URL
+            wait_time: 等待时间（秒）
+        
+        Returns:
+            bool: 是否访问成功
+        """
+        return await self._browser.goto(url, wait_time=wait_time, page=self.main_page)
 
 
 class PublishManager:
     """发布管理类，处理笔记的发布等操作"""
     
-    def __init__(self, browser_manager):
+    def __init__(self, browser_manager, selector_hits: Optional[Counter] = None,
+                 hits_lock: Optional[asyncio.Lock] = None):
         """初始化发布管理器
         
         Args:
             browser_manager: 浏览器管理器实例
+            selector_hits (Optional[Counter]): 共享的选择器命中统计，为None时从磁盘加载
+            hits_lock (Optional[asyncio.Lock]): 共享的命中统计写盘锁，为None时新建
         """
         self.browser = browser_manager
+        # 选择器命中统计，用于把最常命中的选择器排到前面（持久化到磁盘以便冷启动复用）
+        self._selector_hits_file = config.paths.data_dir / "selector_hits.json"
+        self._selector_hits: Counter = (
+            selector_hits if selector_hits is not None else self._load_selector_hits()
+        )
+        # 串行化命中统计写盘，并发发布时避免多个线程同时写同一个文件
+        self._hits_lock = hits_lock or asyncio.Lock()
+        # 已编译的Locator缓存（Locator是惰性的，可跨页面导航复用）
+        self._locators = {}
+        self._locators_page = None
+        # 已解析的视频文件输入元素句柄（页面导航后失效）
+        self._cached_video_input = None
+        self._video_input_page = None
+    
+    async def _settle(self, locator, state: str = "visible", timeout: int = 5000) -> bool:
+        """等待操作的实际后置条件成立，替代固定时长的sleep
+        
+        Args:
+            locator: 表示后置条件的Locator
+            state (str): 期望的元素状态 ('visible', 'hidden', 'attached', 'detached')
+            timeout (int): 最长等待时间（毫秒）
+        
+        Returns:
+            bool: 条件是否在超时前成立
+        """
+        try:
+            await locator.wait_for(state=state, timeout=timeout)
+            return True
+        except Exception:
+            return False
+    
+    async def _probe(self, key: str, timeout: int = 5000):
+        """等待逻辑元素挂载到DOM，多个探测可通过asyncio.gather并发发出
+        
+        Args:
+            key (str): _SELECTOR_UNIONS 中的逻辑元素名
+            timeout (int): 最长等待时间（毫秒）
+        
+        Returns:
+            Locator: 元素已挂载时返回Locator，否则返回None
+        """
+        locator = await self._first(key)
+        if await self._settle(locator, state="attached", timeout=timeout):
+            return locator
+        return None
+    
+    async def _first(self, key: str):
+        """获取逻辑元素对应的Locator（选择器并集的第一个匹配），按页面缓存
+        
+        Args:
+            key (str): _SELECTOR_UNIONS 中的逻辑名称
+        
+        Returns:
+            Locator: 缓存的Locator对象
+        """
+        page = self.browser.main_page
+        if self._locators_page is not page:
+            # 浏览器重启后页面对象会变化，旧的Locator不可再用
+            self._locators = {}
+            self._locators_page = page
+        
+        locator = self._locators.get(key)
+        if locator is None:
+            locator = page.locator(_SELECTOR_UNIONS[key]).first
+            self._locators[key] = locator
+        return locator
+    
+    async def _get_video_input(self):
+        """获取视频文件输入元素句柄，会话内缓存，仍挂载在DOM上时直接复用
+        
+        Returns:
+            Optional[ElementHandle]: 视频文件输入元素，页面上不存在时返回None
+        """
+        page = self.browser.main_page
+        if self._video_input_page is not page:
+            # 新页面：旧页面上的句柄不可再用
+            self._cached_video_input = None
+            self._video_input_page = page
+        
+        handle = self._cached_video_input
+        if handle is not None:
+            # 导航后旧句柄已脱离DOM或所在上下文已销毁，这里检查即可，无需在页面上注册导航监听
+            try:
+                if await handle.evaluate("el => el.isConnected"):
+                    return handle
+            except Exception:
+                pass
+        
+        self._cached_video_input = await page.query_selector(_SELECTOR_UNIONS["video_file_input"])
+        return self._cached_video_input
+    
+    async def _suggestion_item(self):
+        """获取第一个可见话题建议项的Locator（候选选择器以 or_ 链组合，按页面缓存）
+        
+        Returns:
+            Locator: 缓存的Locator对象
+        """
+        # 复用 _first 的页面失效逻辑
+        await self._first("topic_suggestion")
+        locator = self._locators.get("suggestion_item")
+        if locator is None:
+            page = self.browser.main_page
+            locator = page.locator(f"{_SUGGESTION_SELECTORS[0]}:visible")
+            for selector in _SUGGESTION_SELECTORS[1:]:
+                locator = locator.or_(page.locator(f"{selector}:visible"))
+            locator = locator.first
+            self._locators["suggestion_item"] = locator
+        return locator
+    
+    def _load_selector_hits(self) -> Counter:
+        """从磁盘加载选择器命中统计
+        
+        Returns:
+            Counter: 选择器 -> 命中次数
+        """
+        try:
+            if self._selector_hits_file.exists():
+                with open(self._selector_hits_file, 'r', encoding='utf-8') as f:
+                    return Counter(json.load(f))
+        except Exception as e:
+            logger.warning("加载选择器命中统计失败: %s", e)
+        return Counter()
+    
+    async def _record_selector_hit(self, selector: str):
+        """记录一次选择器命中并持久化（文件写入放到线程池，避免阻塞事件循环）
+        
+        Args:
+            selector (str): 命中的选择器
+        """
+        self._selector_hits[selector] += 1
+        async with self._hits_lock:
+            # 在锁内取快照，保证后写入的总是更新的计数；写盘期间其他协程可以继续更新计数
+            await asyncio.to_thread(self._save_selector_hits, dict(self._selector_hits))
+    
+    def _save_selector_hits(self, hits: Dict[str, int]):
+        """把选择器命中统计写入磁盘
+        
+        Args:
+            hits (Dict[str, int]): 选择器 -> 命中次数
+        """
+        try:
+            with open(self._selector_hits_file, 'w', encoding='utf-8') as f:
+                json.dump(hits, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning("保存选择器命中统计失败: %s", e)
+    
+    def _rank_selectors(self, selectors: List[str]) -> List[str]:
+        """按历史命中次数对选择器排序，命中多的优先尝试（排序稳定，未命中的保持原顺序）
+        
+        Args:
+            selectors (List[str]): 候选选择器列表
+        
+        Returns:
+            List[str]: 排序后的选择器列表
+        """
+        return sorted(selectors, key=lambda sel: -self._selector_hits[sel])
     
     async def publish_note(self, title: str, content: str, media_paths: List[str], topics: Optional[List[str]] = None):
         """发布图文或视频笔记
@@ -33,25 +678,87 @@ class PublishManager:
         login_status = await self.browser.ensure_browser()
         if not login_status:
             return "请先登录小红书账号，才能发布笔记"
-
-        # 检测媒体文件类型
-        video_extensions = {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.mkv', '.webm', '.m4v'}
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff'}
         
-        has_video = False
-        has_image = False
+        return await self._publish(title, content, media_paths, topics)
+    
+    async def publish_notes(self, jobs: List[Dict], concurrency: int = 1) -> List[str]:
+        """批量发布笔记，上一篇发布成功且表单已清空时复用已打开的发布页，避免每篇笔记都重新导航
         
-        for media_path in media_paths:
-            if not os.path.exists(media_path):
-                return f"媒体文件不存在: {media_path}"
-            
-            file_ext = os.path.splitext(media_path)[1].lower()
-            if file_ext in video_extensions:
-                has_video = True
-            elif file_ext in image_extensions:
-                has_image = True
-            else:
-                return f"不支持的文件类型: {file_ext}"
+        Args:
+            jobs (List[Dict]): 笔记列表，每项包含 title、content、media_paths 以及可选的 topics
+            concurrency (int): 同时发布的笔记数，大于1时每篇笔记在共享上下文的独立标签页中并发上传和发布. 默认为1.
+        
+        Returns:
+            List[str]: 每篇笔记的操作结果（与jobs顺序一致）
+        """
+        login_status = await self.browser.ensure_browser()
+        if not login_status:
+            return ["请先登录小红书账号，才能发布笔记"] * len(jobs)
+        
+        if concurrency > 1 and len(jobs) > 1:
+            return await self._publish_parallel(jobs, min(concurrency, _MAX_PARALLEL_PAGES))
+        
+        results = []
+        for job in jobs:
+            # 只有上一篇确认发布成功时才尝试复用发布页，失败后的页面可能残留图片和正文
+            reuse_page = bool(results) and results[-1] == "笔记发布成功"
+            try:
+                result = await self._publish(
+                    job["title"], job["content"], job["media_paths"], job.get("topics"), reuse_page=reuse_page
+                )
+            except Exception as e:
+                result = f"发布笔记时出错: {str(e)}"
+            results.append(result)
+        return results
+    
+    async def _publish_parallel(self, jobs: List[Dict], concurrency: int) -> List[str]:
+        """在共享浏览器上下文的多个标签页中并发发布笔记
+        
+        Args:
+            jobs (List[Dict]): 笔记列表
+            concurrency (int): 同时打开的标签页数量上限
+        
+        Returns:
+            List[str]: 每篇笔记的操作结果（与jobs顺序一致）
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def publish_one(job: Dict) -> str:
+            # 标签页从浏览器管理器的标签页池借出，发布结束后归还复用
+            async with semaphore, self.browser.acquire_page() as page:
+                try:
+                    # 共享命中统计和写盘锁，不在每个工作者中重新读盘
+                    worker = PublishManager(
+                        _PageScope(self.browser, page), self._selector_hits, self._hits_lock
+                    )
+                    return await worker._publish(
+                        job["title"], job["content"], job["media_paths"], job.get("topics")
+                    )
+                except Exception as e:
+                    return f"发布笔记时出错: {str(e)}"
+        
+        return list(await asyncio.gather(*(publish_one(job) for job in jobs)))
+    
+    async def _publish(self, title: str, content: str, media_paths: List[str],
+                       topics: Optional[List[str]] = None, reuse_page: bool = False) -> str:
+        """按阶段执行一次发布，每个阶段自行处理错误
+        
+        Args:
+            title (str): 笔记标题
+            content (str): 笔记正文内容
+            media_paths (List[str]): 媒体文件路径列表
+            topics (Optional[List[str]], optional): 话题标签列表. 默认为None.
+            reuse_page (bool): 当前已在发布页时是否跳过重新导航
+        
+        Returns:
+            str: 操作结果
+        """
+        # 检测媒体文件类型（文件系统调用放到线程池，避免阻塞事件循环）
+        has_video, has_image, error, stats = await asyncio.to_thread(
+            _validate_paths, media_paths
+        )
+        if error:
+            return error
         
         # 检查是否混合了视频和图片
         if has_video and has_image:
@@ -60,496 +767,541 @@ class PublishManager:
         # 检查视频文件数量
         if has_video and len(media_paths) > 1:
             return "一次只能上传一个视频文件"
-
+        
+        # 话题在进入逐个输入流程前统一规范化一次，避免出现“##话题”
+        if topics:
+            topics = [m.group(1) for m in map(_HASHTAG_RE.match, topics) if m]
+        
+        error = await self._navigate(reuse_page)
+        if error:
+            return error
+        
+        await self._select_mode(has_video)
+        await self._upload_all(media_paths, has_video, stats)
+        
+        # 上传完成后编辑区才出现：并发探测标题、正文和发布按钮，随后按顺序填写
+        title_input, content_input, publish_button = await asyncio.gather(
+            self._probe("title"), self._probe("content"), self._probe("publish")
+        )
+        
+        await self._write_title(title_input, title)
+        await self._write_body(content_input, content, topics)
+        return await self._click_publish(publish_button)
+    
+    async def _navigate(self, reuse_page: bool = False) -> Optional[str]:
+        """打开发布页
+        
+        Args:
+            reuse_page (bool): 当前已在发布页且表单为空时是否跳过导航
+        
+        Returns:
+            Optional[str]: 出错时返回错误信息，否则返回None
+        """
         try:
-            # 访问小红书创作服务平台
-            await self.browser.goto("https://creator.xiaohongshu.com/publish/publish?source=official&from=tab_switch", wait_time=5)
+            if reuse_page and await self._on_empty_publish_page():
+                return None
             
-            # 根据文件类型选择对应的模式
-            if has_video:
-                # 切换到视频模式
+            # 访问小红书创作服务平台
+            if not await self.browser.goto(_PUBLISH_URL, wait_time=5):
+                return "无法打开发布页，笔记发布失败"
+            return None
+        except Exception as e:
+            return f"发布笔记时出错: {str(e)}"
+    
+    async def _on_empty_publish_page(self) -> bool:
+        """检查当前是否停留在发布页且表单已清空（可直接开始下一篇）
+        
+        Returns:
+            bool: 可以复用当前发布页时返回True
+        """
+        page = self.browser.main_page
+        if not page.url.startswith(_PUBLISH_URL.split("?")[0]):
+            return False
+        try:
+            return bool(await page.evaluate(_FORM_EMPTY_JS, _FORM_EMPTY_ARG))
+        except PlaywrightError as e:
+            logger.debug("检查发布页表单失败，重新导航: %s", e)
+            return False
+    
+    async def _select_mode(self, has_video: bool):
+        """根据文件类型切换到视频或图文模式
+        
+        Args:
+            has_video (bool): 是否为视频笔记
+        """
+        key, label, timeout = ("video_tab", "视频", 3000) if has_video else ("image_tab", "图文", 2000)
+        try:
+            # 一次evaluate完成查找和点击；标签尚未渲染时再退回等待选择器并集
+            clicked = await self.browser.main_page.evaluate(_MODE_TAB_CLICK_JS, f"上传{label}")
+            if not clicked:
+                tab = await self._probe(key)
+                if tab:
+                    await tab.click()
+                    clicked = True
+            if clicked:
+                await self._settle(await self._first("file_input"), state="attached", timeout=timeout)
+                logger.info("已切换到%s模式", label)
+        except Exception as e:
+            logger.warning("切换到%s模式时出错: %s", label, e)
+    
+    async def _upload_all(self, media_paths: List[str], has_video: bool, stats: Dict[str, os.stat_result]):
+        """上传全部媒体文件
+        
+        Args:
+            media_paths (List[str]): 媒体文件路径列表
+            has_video (bool): 是否为视频笔记（视频只上传第一个文件）
+            stats (Dict[str, os.stat_result]): 校验阶段得到的文件stat结果
+        """
+        if has_video:
+            await self._upload(media_paths[:1], "video", stats)
+            return
+        
+        # 多张图片一次性设置到文件输入元素
+        await self._upload(media_paths, "image", stats)
+    
+    async def _write_title(self, title_input, title: str):
+        """输入标题
+        
+        Args:
+            title_input: 标题输入框Locator，未找到时为None
+            title (str): 笔记标题
+        """
+        try:
+            if title_input:
+                await title_input.fill(title)
+                await expect(title_input).to_have_value(title, timeout=1000)
+        except Exception as e:
+            logger.warning("输入标题时出错: %s", e)
+    
+    async def _write_body(self, content_input, content: str, topics: Optional[List[str]]):
+        """输入正文内容（支持#话题自动标签化）
+        
+        Args:
+            content_input: 正文输入框Locator，未找到时为None
+            content (str): 笔记正文内容
+            topics (Optional[List[str]]): 话题标签列表
+        """
+        try:
+            if content_input:
+                await content_input.click()
                 try:
-                    video_tab = await self.browser.main_page.query_selector('text="上传视频"')
-                    if video_tab:
-                        await video_tab.click()
-                        await asyncio.sleep(3)
-                        print("已切换到视频模式")
-                    else:
-                        # 尝试其他视频相关的选择器
-                        video_selectors = [
-                            'div[data-testid="video-tab"]',
-                            'button:has-text("视频")',
-                            '.tab-video',
-                            '[role="tab"]:has-text("视频")'
-                        ]
-                        for selector in video_selectors:
-                            video_tab = await self.browser.main_page.query_selector(selector)
-                            if video_tab:
-                                await video_tab.click()
-                                await asyncio.sleep(3)
-                                print(f"使用选择器 {selector} 切换到视频模式")
-                                break
-                except Exception as e:
-                    print(f"切换到视频模式时出错: {str(e)}")
-                
-                # 上传视频文件
-                video_path = media_paths[0]
-                await self._upload_video(video_path)
+                    await expect(content_input).to_be_focused(timeout=500)
+                except AssertionError:
+                    pass
                 
-            else:
-                # 切换到图文模式
+                # 一次evaluate批量插入正文和话题标签，避免逐字符输入
                 try:
-                    text_tab = await self.browser.main_page.query_selector('text="上传图文"')
-                    if text_tab:
-                        await text_tab.click()
-                        await asyncio.sleep(2)
-                        print("已切换到图文模式")
-                except Exception as e:
-                    print(f"切换到图文模式时出错: {str(e)}")
+                    batch_result = await content_input.evaluate(
+                        _BATCH_INSERT_JS, {"content": content, "topics": list(topics or [])}
+                    )
+                except Exception as batch_e:
+                    logger.warning("批量插入正文失败，改为逐字输入: %s", batch_e)
+                    batch_result = None
                 
-                # 上传图片文件
-                for img_path in media_paths:
-                    await self._upload_image(img_path)
-            
-            # 输入标题
-            try:
-                title_input = await self.browser.main_page.query_selector('input[placeholder*="标题"], textarea[placeholder*="标题"]')
-                if title_input:
-                    await title_input.fill(title)
-                    await asyncio.sleep(1)
-            except Exception as e:
-                print(f"输入标题时出错: {str(e)}")
-            
-            # 输入正文内容（支持#话题自动标签化）
-            try:
-                content_input = await self.browser.main_page.query_selector('div[contenteditable="true"], textarea[placeholder*="输入正文"], [role="textbox"]')
-                if content_input:
-                    await content_input.click()
-                    await asyncio.sleep(0.5)
-                    
+                if batch_result is not None and not batch_result.get('inserted'):
+                    logger.warning("批量插入未写入正文，改为逐字输入")
+                    batch_result = None
+                
+                if batch_result is None:
                     # 输入基础内容
                     await content_input.type(content)
-                    await asyncio.sleep(0.5)
-                    
-                    # 添加话题标签（在内容末尾）
-                    if topics and len(topics) > 0:
+                    if topics:
                         await content_input.type('\n\n')  # 换行分隔
-                        print(f"开始添加话题标签，共 {len(topics)} 个")
-                        
-                        for i, topic in enumerate(topics):
-                            topic_text = f"#{topic}"
-                            print(f"输入话题标签: {topic_text}")
-                            await content_input.type(topic_text)
-                            await asyncio.sleep(2)  # 等待下拉建议出现
-                            
-                            # 等待并查找话题下拉建议列表
-                            print("等待话题下拉建议出现...")
-                            suggestion_clicked = False
-                            
-                            # 尝试多种选择器来找到下拉建议
-                            suggestion_selectors = [
-                                # 基于截图中的结构，话题建议可能在这些容器中
-                                'div[class*="topic"] div[class*="item"]:first-child',
-                                'div[class*="suggestion"] div[class*="item"]:first-child',
-                                '.topic-suggestion-list .topic-item:first-child',
-                                '.suggestion-dropdown .suggestion-item:first-child',
-                                # Element UI 相关选择器
-                                '.el-select-dropdown__item:first-child',
-                                '.el-autocomplete-suggestion__list li:first-child',
-                                '.el-autocomplete-suggestion li:first-child',
-                                # 通用的下拉列表选择器
-                                'ul li:first-child',
-                                'div[role="option"]:first-child',
-                                'li[role="option"]:first-child',
-                                # 可能的话题容器
-                                '.topic-dropdown .topic-option:first-child',
-                                '.hashtag-dropdown .hashtag-option:first-child'
-                            ]
-                            
-                            # 尝试每个选择器
-                            for selector in suggestion_selectors:
-                                try:
-                                    print(f"尝试选择器: {selector}")
-                                    suggestion = await self.browser.main_page.query_selector(selector)
-                                    if suggestion:
-                                        is_visible = await suggestion.is_visible()
-                                        print(f"找到建议项，可见性: {is_visible}")
-                                        if is_visible:
-                                            # 获取建议项的文本内容
-                                            suggestion_text = await suggestion.text_content()
-                                            print(f"建议项文本: {suggestion_text}")
-                                            
-                                            await suggestion.click()
-                                            await asyncio.sleep(1)
-                                            suggestion_clicked = True
-                                            print(f"成功点击话题建议: {suggestion_text}")
-                                            break
-                                except Exception as sel_e:
-                                    print(f"选择器 {selector} 失败: {str(sel_e)}")
-                                    continue
-                            
-                            # 如果标准选择器都没找到，尝试JavaScript查找
-                            if not suggestion_clicked:
-                                print("尝试使用JavaScript查找话题建议...")
-                                js_click_result = await self.browser.main_page.evaluate(f'''
-                                    () => {{
-                                        // 查找包含话题文本的元素
-                                        const allElements = Array.from(document.querySelectorAll('div, li, span, a'));
-                                        
-                                        // 寻找包含当前话题关键词的建议项
-                                        const topicKeyword = "{topic}";
-                                        const suggestionItems = allElements.filter(el => {{
-                                            const text = el.textContent;
-                                            return text && (
-                                                text.includes('#{topic}') ||
-                                                text.includes(topicKeyword) ||
-                                                text.includes('次浏览')
-                                            );
-                                        }});
-                                        
-                                        if (suggestionItems.length > 0) {{
-                                            // 优先选择完全匹配的项
-                                            let targetItem = suggestionItems.find(el => 
-                                                el.textContent.includes('#{topic}')
-                                            );
-                                            
-                                            // 如果没有完全匹配，选择第一个相关项
-                                            if (!targetItem) {{
-                                                targetItem = suggestionItems[0];
-                                            }}
-                                            
-                                            // 高亮并点击
-                                            targetItem.style.border = '3px solid red';
-                                            targetItem.click();
-                                            
-                                            return {{
-                                                success: true,
-                                                text: targetItem.textContent.trim(),
-                                                found: suggestionItems.length
-                                            }};
-                                        }}
-                                        
-                                        return {{ success: false, found: 0 }};
-                                    }}
-                                ''')
-                                
-                                print(f"JavaScript点击结果: {js_click_result}")
-                                if js_click_result.get('success'):
-                                    suggestion_clicked = True
-                                    print(f"JavaScript成功点击建议: {js_click_result.get('text')}")
-                            
-                            if not suggestion_clicked:
-                                print(f"未找到话题建议项，标签 {topic_text} 可能未被激活")
-                                # 按回车或空格尝试确认
-                                await content_input.press('Enter')
-                                await asyncio.sleep(0.5)
-                            
-                            # 如果不是最后一个话题，添加空格
-                            if i < len(topics) - 1:
-                                await content_input.type(' ')
-                                await asyncio.sleep(0.5)
-                        
-                        print("话题标签添加完成")
-                    
-                    await asyncio.sleep(1)
-                else:
-                    print("未找到内容输入框，使用兼容逻辑")
-                    # 兼容原有逻辑
-                    await self.browser.main_page.evaluate('''
-                        () => {
-                            const textareas = Array.from(document.querySelectorAll('textarea, [contenteditable="true"]'));
-                            const contentArea = textareas.find(el => 
-                                el.placeholder && (
-                                    el.placeholder.includes('输入') || 
-                                    el.placeholder.includes('描述') || 
-                                    el.placeholder.includes('正文')
-                                )
-                            );
-                            if (contentArea) contentArea.focus();
-                            return !!contentArea;
-                        }
-                    ''')
-                    # 构建包含话题标签的完整内容
-                    full_content = content
-                    if topics and len(topics) > 0:
-                        topic_tags = ' '.join([f'#{topic}' for topic in topics])
-                        full_content = f"{content}\n\n{topic_tags}"
-                    
-                    await self.browser.main_page.keyboard.type(full_content)
-                    await asyncio.sleep(1)
-            except Exception as e:
-                print(f"输入正文内容时出错: {str(e)}")
-            
-            # 立即发布（默认选择立即发布）
-            immediate_publish = await self.browser.main_page.query_selector('text="立即发布"')
-            if immediate_publish:
-                # 确保选择立即发布
-                await immediate_publish.click()
-                await asyncio.sleep(1)
-            
-            # 点击发布按钮
-            publish_button = await self.browser.main_page.query_selector('button:has-text("发布"), button:has-text("发布笔记"), [aria-label="发布"]')
-            if publish_button:
-                await publish_button.click()
-                await asyncio.sleep(5)  # 等待发布完成
                 
-                # 检查是否有发布成功的提示
-                success_message = await self.browser.main_page.query_selector('text="发布成功"')
-                if success_message:
-                    return "笔记发布成功"
-                
-                # 检查是否有错误提示
-                error_message = await self.browser.main_page.query_selector('.error-message, .toast-message')
-                if error_message:
-                    error_text = await error_message.text_content()
-                    return f"发布失败: {error_text}"
-                
-                return "笔记已提交发布，但未收到明确的成功反馈"
+                if topics and batch_result and batch_result.get('topicsTagged'):
+                    logger.info("话题标签已批量插入，共 %s 个", len(topics))
+                # 添加话题标签（在内容末尾），编辑器需要逐个下拉确认时走此流程
+                elif topics:
+                    await self._add_topics(content_input, topics)
             else:
-                return "未找到发布按钮，笔记发布失败"
-        
+                logger.warning("未找到内容输入框，使用兼容逻辑")
+                # 兼容原有逻辑
+                await self.browser.main_page.evaluate('''
+                    () => {
+                        const textareas = Array.from(document.querySelectorAll('textarea, [contenteditable="true"]'));
+                        const contentArea = textareas.find(el => 
+                            el.placeholder && (
+                                el.placeholder.includes('输入') || 
+                                el.placeholder.includes('描述') || 
+                                el.placeholder.includes('正文')
+                            )
+                        );
+                        if (contentArea) contentArea.focus();
+                        return !!contentArea;
+                    }
+                ''')
+                # 构建包含话题标签的完整内容
+                full_content = f"{content}\n\n#{' #'.join(topics)}" if topics else content
+                
+                await self.browser.main_page.keyboard.type(full_content)
         except Exception as e:
-            return f"发布笔记时出错: {str(e)}"
-
-    async def _upload_image(self, img_path: str):
-        """上传图片文件
+            logger.warning("输入正文内容时出错: %s", e)
+    
+    async def _add_topics(self, content_input, topics: List[str]):
+        """逐个输入话题标签并从下拉建议中选中
         
         Args:
-            img_path (str): 图片文件路径
+            content_input: 正文输入框Locator
+            topics (List[str]): 话题标签列表
         """
+        logger.info("开始添加话题标签，共 %s 个", len(topics))
+        
+        # 探测编辑器是否暴露了Element UI自动补全组件实例，可用则直接调用组件选择建议项
         try:
-            if not os.path.exists(img_path):
-                print(f"图片不存在: {img_path}")
-                return
-            
-            print(f"尝试上传图片: {img_path}")
-            
-            # 截图保存当前界面状态（用于调试）
+            vue_autocomplete = await self.browser.main_page.evaluate(_VUE_AUTOCOMPLETE_PROBE_JS)
+        except Exception:
+            vue_autocomplete = False
+        
+        for i, topic in enumerate(topics):
+            topic_text = f"#{topic}"
+            logger.debug("输入话题标签: %s", topic_text)
+            await content_input.type(topic_text)
+            # 等待下拉建议出现（最多2秒），下拉一出现立即返回
+            suggestion_list = await self._first("topic_suggestion")
             try:
-                screenshot_path = os.path.join(os.path.dirname(img_path), "page_screenshot.png")
-                await self.browser.main_page.screenshot(path=screenshot_path)
-                print(f"已保存页面截图到: {screenshot_path}")
-            except Exception as ss_e:
-                print(f"截图失败: {str(ss_e)}")
+                await self.browser.main_page.evaluate(
+                    _WAIT_SUGGESTION_JS, {"selector": _SELECTOR_UNIONS["topic_suggestion"], "ms": 2000}
+                )
+            except Exception:
+                await self._settle(suggestion_list, timeout=2000)
             
-            # 查找红色上传图片按钮 - 基于截图中的视觉特征添加精确选择器
-            red_upload_button_selectors = [
-                'button.el-button--danger',  # 红色按钮类
-                '.el-button--danger',        # 红色按钮类
-                'button.upload-btn',         # 上传按钮
-                '.upload-image-btn',         # 上传图片按钮
-                'button.upload-image-btn',   # 上传图片按钮
-                '.upload-btn',               # 上传按钮
-                'button:has-text("上传图片")',  # 文本匹配
-                '.el-upload button',         # Element UI上传组件的按钮
-                '.el-upload__input',         # Element UI上传组件的输入
-                '.upload-area button',       # 上传区域中的按钮
-                '.upload-btn--primary',      # 主要上传按钮
-                '.upload-container button'   # 上传容器中的按钮
-            ]
+            # 等待并查找话题下拉建议列表
+            logger.debug("等待话题下拉建议出现...")
+            suggestion_clicked = False
             
-            # 首先尝试直接找到输入元素
-            file_input = await self.browser.main_page.query_selector('input[type="file"]')
-            if file_input:
-                print("找到文件输入元素，直接设置文件")
-                await file_input.set_input_files(img_path)
-                print(f"已直接设置文件: {img_path}")
-                await asyncio.sleep(3)  # 等待图片上传
-                return  # 如果成功直接设置文件，跳过后续尝试
-                        
-            # 尝试具体的红色上传按钮选择器
-            upload_button = None
-            for selector in red_upload_button_selectors:
-                print(f"尝试红色上传按钮选择器: {selector}")
-                button = await self.browser.main_page.query_selector(selector)
-                if button:
-                    upload_button = button
-                    print(f"找到红色上传按钮，使用选择器: {selector}")
-                    break
+            # 快速路径：通过Vue组件实例直接选中第一个建议项
+            if vue_autocomplete:
+                try:
+                    suggestion_clicked = await self.browser.main_page.evaluate(_VUE_TOPIC_SELECT_JS)
+                    if suggestion_clicked:
+                        logger.debug("通过组件实例选中话题建议: %s", topic_text)
+                except Exception as vue_e:
+                    logger.warning("通过组件实例选择话题失败: %s", vue_e)
             
-            # 如果找到红色上传按钮，尝试点击上传
-            if upload_button:
-                print("找到红色上传按钮，准备上传图片")
-                
-                # 检查按钮是否可见和可点击
-                is_visible = await upload_button.is_visible()
-                print(f"按钮可见: {is_visible}")
-                
-                # 使用fileChooser处理文件上传
+            # 所有候选选择器组合为一次查询，直接取第一个可见的建议项
+            if not suggestion_clicked:
                 try:
-                    # 设置较长的超时时间等待文件选择器
-                    file_chooser_promise = self.browser.main_page.wait_for_file_chooser(timeout=10000)
-                    await upload_button.click()
-                    print("已点击红色上传按钮")
-                    
-                    try:
-                        file_chooser = await file_chooser_promise
-                        await file_chooser.set_files(img_path)
-                        print(f"已设置文件: {img_path}")
-                        await asyncio.sleep(3)  # 等待图片上传
-                    except Exception as fc_e:
-                        print(f"等待文件选择器出错: {str(fc_e)}")
+                    suggestion = await self._suggestion_item()
+                    if await suggestion.count():
+                        # 获取建议项的文本内容
+                        suggestion_text = await suggestion.text_content()
+                        logger.debug("建议项文本: %s", suggestion_text)
                         
-                        # 如果文件选择器没出现，尝试直接查找文件输入元素
-                        try:
-                            await asyncio.sleep(1)  # 等待可能的DOM变化
-                            file_input = await self.browser.main_page.query_selector('input[type="file"]')
-                            if file_input:
-                                print("点击按钮后找到文件输入元素")
-                                await file_input.set_input_files(img_path)
-                                print(f"已设置文件: {img_path}")
-                                await asyncio.sleep(3)  # 等待图片上传
-                        except Exception as fi_e:
-                            print(f"尝试找文件输入元素出错: {str(fi_e)}")
-                except Exception as click_e:
-                    print(f"点击上传按钮出错: {str(click_e)}")
+                        await suggestion.click()
+                        await self._settle(suggestion_list, state="hidden", timeout=1000)
+                        suggestion_clicked = True
+                        logger.debug("成功点击话题建议: %s", suggestion_text)
+                except Exception as sel_e:
+                    logger.debug("点击话题建议失败: %s", sel_e)
             
-        except Exception as e:
-            print(f"上传图片过程中出错: {str(e)}")
+            # 如果标准选择器都没找到，尝试JavaScript查找
+            if not suggestion_clicked:
+                logger.debug("尝试使用JavaScript查找话题建议...")
+                js_click_result = await self.browser.main_page.evaluate(_TOPIC_CLICK_JS, topic)
+                
+                logger.debug("JavaScript点击结果: %s", js_click_result)
+                if js_click_result.get('success'):
+                    suggestion_clicked = True
+                    logger.debug("JavaScript成功点击建议: %s", js_click_result.get('text'))
+            
+            if not suggestion_clicked:
+                logger.warning("未找到话题建议项，标签 %s 可能未被激活", topic_text)
+                # 按回车或空格尝试确认
+                await content_input.press('Enter')
+            
+            # 如果不是最后一个话题，添加空格
+            if i < len(topics) - 1:
+                await content_input.type(' ')
+        
+        logger.info("话题标签添加完成")
     
-    async def _upload_video(self, video_path: str):
-        """上传视频文件
+    async def _click_publish(self, publish_button) -> str:
+        """选择立即发布、点击发布按钮并读取发布结果
         
         Args:
-            video_path (str): 视频文件路径
+            publish_button: 发布按钮Locator，未找到时为None
+        
+        Returns:
+            str: 操作结果
         """
         try:
-            if not os.path.exists(video_path):
-                print(f"视频不存在: {video_path}")
-                return
+            # 立即发布（默认选择立即发布）
+            immediate_publish = await self._first("immediate_publish")
+            if await immediate_publish.count():
+                # 确保选择立即发布
+                await immediate_publish.click()
             
-            print(f"尝试上传视频: {video_path}")
+            # 点击发布按钮
+            if not publish_button:
+                return "未找到发布按钮，笔记发布失败"
             
-            # 查找视频上传相关的按钮和输入元素
-            video_upload_selectors = [
-                'input[type="file"][accept*="video"]',  # 接受视频的文件输入
-                'input[type="file"]',                   # 通用文件输入
-                'button:has-text("上传视频")',          # 上传视频按钮
-                'button:has-text("选择视频")',          # 选择视频按钮
-                '.video-upload-btn',                   # 视频上传按钮类
-                '.upload-video-btn',                   # 上传视频按钮类
-                '.el-upload button',                   # Element UI上传组件的按钮
-                '.upload-area',                        # 上传区域
-                '.video-upload-area'                   # 视频上传区域
-            ]
+            await publish_button.click()
+            # 成功/失败提示合并为一个Locator，先出现的即为结果
+            outcome = await self._first("publish_result")
+            if await self._settle(outcome, timeout=15000):
+                class_name, text = await outcome.evaluate("e => [String(e.className), e.textContent || '']")
+                if "发布成功" in text or "success" in class_name:
+                    return "笔记发布成功"
+                return f"发布失败: {text.strip()}"
             
-            # 首先尝试直接找到视频文件输入元素
-            for selector in video_upload_selectors:
-                print(f"尝试视频上传选择器: {selector}")
-                element = await self.browser.main_page.query_selector(selector)
-                if element:
-                    element_tag = await element.evaluate('el => el.tagName')
-                    if element_tag == 'INPUT':
-                        print("找到视频文件输入元素，直接设置文件")
-                        await element.set_input_files(video_path)
-                        print(f"已直接设置视频文件: {video_path}")
-                        await asyncio.sleep(5)  # 视频上传需要更长时间
-                        return
+            return "笔记已提交发布，但未收到明确的成功反馈"
+        except Exception as e:
+            return f"发布笔记时出错: {str(e)}"
+
+    async def _upload(self, paths: Union[str, List[str]], kind: str, stats: Dict[str, os.stat_result]):
+        """上传媒体文件：优先直接设置隐藏的文件输入元素，找不到时才点击上传按钮走文件选择器
+        
+        Args:
+            paths (Union[str, List[str]]): 媒体文件路径或路径列表（已在校验阶段确认存在），多个文件一次性设置
+            kind (str): 媒体类型 ('image' 或 'video')
+            stats (Dict[str, os.stat_result]): 校验阶段得到的文件stat结果
+        """
+        files = [paths] if isinstance(paths, str) else list(paths)
+        label = "视频" if kind == "video" else "图片"
+        try:
+            logger.debug("尝试上传%s: %s", label, files)
+            
+            # 快速路径：直接设置文件输入元素，无需点击和文件选择器握手
+            for key in _DIRECT_INPUT_KEYS[kind]:
+                if key == "video_file_input":
+                    # 视频输入元素在会话内复用已解析的句柄
+                    file_input = await self._get_video_input()
+                    found = file_input is not None
+                else:
+                    file_input = await self._first(key)
+                    found = await file_input.count() > 0
+                if found:
+                    logger.debug("找到文件输入元素，直接设置文件")
+                    # 输入框不支持多选时只能逐个设置
+                    if len(files) > 1 and not await file_input.evaluate("el => el.multiple"):
+                        batches = [[f] for f in files]
                     else:
-                        # 如果是按钮，尝试点击
-                        print(f"找到视频上传按钮: {selector}")
+                        batches = [files]
+                    for batch in batches:
+                        size = sum(stats[f].st_size for f in batch)
+                        response_watch = self._watch_upload_response(kind, size)
                         try:
-                            file_chooser_promise = self.browser.main_page.wait_for_file_chooser(timeout=10000)
-                            await element.click()
-                            print("已点击视频上传按钮")
-                            
-                            file_chooser = await file_chooser_promise
-                            await file_chooser.set_files(video_path)
-                            print(f"已设置视频文件: {video_path}")
-                            await asyncio.sleep(5)  # 视频上传需要更长时间
-                            return
-                        except Exception as e:
-                            print(f"点击视频上传按钮失败: {str(e)}")
-                            continue
+                            await file_input.set_input_files(batch)
+                            await self._finalize_upload(batch, kind, size, "文件输入元素", response_watch)
+                        finally:
+                            # 设置文件出错或任务被取消时撤掉仍在等待的响应监听
+                            if response_watch and not response_watch.done():
+                                response_watch.cancel()
+                    return
+        except PlaywrightError as e:
+            logger.warning("上传%s过程中出错: %s", label, e)
+            return
+        
+        # 页面上没有文件输入元素时才进入慢速路径
+        await self._upload_via_chooser(files, kind, stats)
+    
+    async def _finalize_upload(self, files: List[str], kind: str, size: int, via: str, response_watch=None):
+        """文件设置成功后的统一收尾：记录日志并等待上传完成
+        
+        Args:
+            files (List[str]): 已设置的文件列表
+            kind (str): 媒体类型 ('image' 或 'video')
+            size (int): 已设置文件的总字节数
+            via (str): 设置文件的方式（用于日志）
+            response_watch (Optional[asyncio.Task]): 设置文件前启动的上传完成响应监听任务
+        """
+        logger.info("已通过%s设置%s文件: %s", via, "视频" if kind == "video" else "图片", files)
+        await self._wait_upload(kind, size, len(files), response_watch)
+    
+    @staticmethod
+    def _upload_wait_ms(kind: str, size: int) -> int:
+        """按文件大小估算上传等待上限（约2MB/s，图片最少3秒、视频最少5秒）
+        
+        Args:
+            kind (str): 媒体类型 ('image' 或 'video')
+            size (int): 本次上传的文件总字节数
+        
+        Returns:
+            int: 等待上限（毫秒）
+        """
+        floor_ms = 5000 if kind == "video" else 3000
+        return max(floor_ms, int(size / (2 * 1024 * 1024) * 1000))
+    
+    def _watch_upload_response(self, kind: str, size: int):
+        """在设置文件之前开始监听上传完成接口的响应，避免错过很快返回的响应
+        
+        Args:
+            kind (str): 媒体类型，只有视频需要监听
+            size (int): 本次上传的文件总字节数，用于确定监听时长
+        
+        Returns:
+            Optional[asyncio.Task]: 监听任务，图片返回None
+        """
+        if kind != "video":
+            return None
+        watch = asyncio.ensure_future(self.browser.main_page.wait_for_response(
+            lambda r: _UPLOAD_COMPLETE_PATH in r.url and r.status == 200,
+            timeout=self._upload_wait_ms(kind, size),
+        ))
+        # 设置文件失败时监听任务无人等待，这里取走其超时异常，避免“exception was never retrieved”告警
+        watch.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return watch
+    
+    async def _wait_upload(self, kind: str, size: int, count: int = 1, response_watch=None):
+        """等待文件上传完成
+        
+        Args:
+            kind (str): 媒体类型 ('image' 或 'video')
+            size (int): 本次上传的文件总字节数，用于估算等待上限
+            count (int): 本次上传的文件数量
+            response_watch (Optional[asyncio.Task]): 设置文件前启动的上传完成响应监听任务
+        """
+        wait_ms = self._upload_wait_ms(kind, size)
+        
+        if kind != "video":
+            # 等待最后一张图片的预览出现
+            previews = self.browser.main_page.locator(_SELECTOR_UNIONS["upload_done"])
+            await self._settle(previews.nth(count - 1), timeout=wait_ms)
+            return
+        
+        # 视频：完成标识出现或上传完成接口返回，任一先到即结束等待
+        done_marker = asyncio.ensure_future(self._wait_video_ready(wait_ms))
+        waiters = [done_marker] + ([response_watch] if response_watch else [])
+        try:
+            pending = set(waiters)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # 响应监听超时或出错不代表上传完成，继续等待另一个信号
+                if any(not w.cancelled() and w.exception() is None and w.result() is not False for w in done):
+                    break
+        finally:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+    
+    async def _wait_video_ready(self, wait_ms: int) -> bool:
+        """等待视频上传完成标识出现
+        
+        优先使用页面内注册的MutationObserver信号（一次协议调用），
+        辅助脚本不可用（如页面先于注册加载）时回退到定位器等待
+        
+        Args:
+            wait_ms (int): 最长等待时间（毫秒）
             
-            # 如果找不到特定的视频上传元素，尝试通用的文件上传
-            print("未找到特定的视频上传元素，尝试通用文件上传方式")
+        Returns:
+            bool: 完成标识是否在超时前出现
+        """
+        try:
+            ready = await self.browser.main_page.evaluate(
+                _UPLOAD_READY_JS, {"selector": _SELECTOR_UNIONS["video_upload_done"], "ms": wait_ms}
+            )
+            return bool(ready)
+        except PlaywrightError as e:
+            logger.debug("上传完成监听脚本调用失败，回退到定位器等待: %s", e)
+        return await self._settle(await self._first("video_upload_done"), timeout=wait_ms)
+    
+    async def _set_files_via_chooser(self, click, files: List[str], timeout: int = 2500,
+                                     attempts: int = 2) -> Optional[List[str]]:
+        """先监听文件选择器事件再执行点击，通过弹出的文件选择器设置文件（短超时快速失败，未弹出时重试点击）
+        
+        Args:
+            click: 执行点击的异步函数，返回False表示没有可点击的元素
+            files (List[str]): 媒体文件路径列表，选择器支持多选时一次性设置
+            timeout (int): 每次等待文件选择器的超时时间（毫秒）
+            attempts (int): 点击尝试次数
+        
+        Returns:
+            Optional[List[str]]: 实际设置的文件列表，失败时返回None
+        """
+        page = self.browser.main_page
+        for attempt in range(attempts):
+            # 在点击之前挂上监听，避免点击后同步触发的filechooser事件丢失
+            chooser_wait = asyncio.ensure_future(page.wait_for_event("filechooser", timeout=timeout))
+            try:
+                if await click() is False:
+                    return None
+                file_chooser = await chooser_wait
+                batch = files if file_chooser.is_multiple() else files[:1]
+                await file_chooser.set_files(batch)
+                return batch
+            except PlaywrightTimeoutError:
+                logger.debug("第%s次点击未弹出文件选择器", attempt + 1)
+            except PlaywrightError as e:
+                logger.warning("等待文件选择器出错: %s", e)
+                return None
+            finally:
+                # 无论点击失败、出错还是任务被取消，都撤掉仍在等待的filechooser监听
+                if not chooser_wait.done():
+                    chooser_wait.cancel()
+        return None
+    
+    async def _chooser_upload(self, click, files: List[str], kind: str,
+                              stats: Dict[str, os.stat_result]) -> bool:
+        """通过点击弹出的文件选择器上传，选择器不支持多选时剩余文件逐个重新上传
+        
+        Args:
+            click: 点击上传触发元素的异步函数，返回False表示没有可点击的元素
+            files (List[str]): 媒体文件路径列表
+            kind (str): 媒体类型 ('image' 或 'video')
+            stats (Dict[str, os.stat_result]): 校验阶段得到的文件stat结果
+        
+        Returns:
+            bool: 是否成功弹出文件选择器并设置文件
+        """
+        size = sum(stats[f].st_size for f in files)
+        response_watch = self._watch_upload_response(kind, size)
+        try:
+            batch = await self._set_files_via_chooser(click, files)
+            if batch is None:
+                return False
+            await self._finalize_upload(batch, kind, sum(stats[f].st_size for f in batch), "文件选择器", response_watch)
+        finally:
+            # 未弹出选择器、出错或任务被取消时撤掉仍在等待的响应监听
+            if response_watch and not response_watch.done():
+                response_watch.cancel()
+        if len(batch) < len(files):
+            await self._upload(files[len(batch):], kind, stats)
+        return True
+    
+    async def _upload_via_chooser(self, files: List[str], kind: str, stats: Dict[str, os.stat_result]):
+        """上传媒体文件（慢速路径：查找上传按钮并通过文件选择器上传）
+        
+        Args:
+            files (List[str]): 媒体文件路径列表
+            kind (str): 媒体类型 ('image' 或 'video')
+            stats (Dict[str, os.stat_result]): 校验阶段得到的文件stat结果
+        """
+        label = "视频" if kind == "video" else "图片"
+        try:
+            # 截图保存当前界面状态（仅调试模式，JPEG编码比PNG小且快）
+            if _DEBUG:
+                try:
+                    screenshot_path = os.path.join(os.path.dirname(files[0]), "page_screenshot.jpg")
+                    await self.browser.main_page.screenshot(path=screenshot_path, type="jpeg", quality=40)
+                    logger.info("已保存页面截图到: %s", screenshot_path)
+                except Exception as ss_e:
+                    logger.warning("截图失败: %s", ss_e)
             
-            # 使用JavaScript查找上传元素
-            js_result = await self.browser.main_page.evaluate('''
-                () => {
-                    // 查找包含"上传视频"、"选择视频"等文本的按钮
-                    const textElements = Array.from(document.querySelectorAll('button, a, div, span'));
-                    const videoUploadBtn = textElements.find(el => 
-                        el.textContent && (
-                            el.textContent.includes('上传视频') ||
-                            el.textContent.includes('选择视频') ||
-                            el.textContent.includes('添加视频')
-                        )
-                    );
-                    
-                    if (videoUploadBtn) {
-                        videoUploadBtn.style.border = '5px solid green';
-                        return {
-                            found: true,
-                            method: 'text',
-                            tag: videoUploadBtn.tagName,
-                            text: videoUploadBtn.textContent.trim()
-                        };
-                    }
-                    
-                    // 查找所有文件输入元素
-                    const fileInputs = Array.from(document.querySelectorAll('input[type="file"]'));
-                    if (fileInputs.length > 0) {
-                        fileInputs[0].style.border = '5px solid blue';
-                        return {
-                            found: true,
-                            method: 'input',
-                            tag: fileInputs[0].tagName,
-                            accept: fileInputs[0].accept || 'none'
-                        };
-                    }
-                    
-                    // 查找上传区域
-                    const uploadAreas = Array.from(document.querySelectorAll('.upload-area, .el-upload, [class*="upload"]'));
-                    if (uploadAreas.length > 0) {
-                        uploadAreas[0].style.border = '5px solid yellow';
-                        return {
-                            found: true,
-                            method: 'area',
-                            tag: uploadAreas[0].tagName,
-                            classes: uploadAreas[0].className
-                        };
-                    }
-                    
-                    return { found: false };
-                }
-            ''')
+            # 按历史命中次数依次尝试上传按钮选择器
+            for selector in self._rank_selectors(_UPLOAD_TRIGGER_SELECTORS[kind]):
+                logger.debug("尝试%s上传按钮选择器: %s", label, selector)
+                button = await self.browser.main_page.query_selector(selector)
+                if not button:
+                    continue
+                await self._record_selector_hit(selector)
+                logger.debug("找到%s上传按钮，使用选择器: %s", label, selector)
+                if await self._chooser_upload(button.click, files, kind, stats):
+                    return
+            
+            if kind != "video":
+                return
             
-            print(f"JavaScript查找视频上传元素结果: {js_result}")
+            # 如果找不到特定的视频上传元素，尝试通过文本查找上传按钮
+            logger.debug("未找到特定的视频上传元素，尝试通用文件上传方式")
             
-            if js_result.get('found'):
-                # 根据查找结果尝试上传
-                method = js_result.get('method')
-                if method == 'input':
-                    # 直接使用文件输入
-                    file_input = await self.browser.main_page.query_selector('input[type="file"]')
-                    if file_input:
-                        await file_input.set_input_files(video_path)
-                        print(f"通过文件输入设置视频: {video_path}")
-                        await asyncio.sleep(5)
-                else:
-                    # 尝试点击按钮或区域
-                    clicked = await self.browser.main_page.evaluate('''
-                        () => {
-                            const highlightedElements = Array.from(document.querySelectorAll('[style*="border: 5px solid"]'));
-                            if (highlightedElements.length > 0) {
-                                highlightedElements[0].click();
-                                return true;
-                            }
-                            return false;
-                        }
-                    ''')
-                    
-                    if clicked:
-                        print("通过JavaScript成功点击了视频上传元素")
-                        try:
-                            file_chooser = await self.browser.main_page.wait_for_file_chooser(timeout=5000)
-                            await file_chooser.set_files(video_path)
-                            print(f"通过点击设置视频文件: {video_path}")
-                            await asyncio.sleep(5)
-                        except Exception as e:
-                            print(f"点击后等待文件选择器失败: {str(e)}")
+            # 使用JavaScript在一次调用中查找并点击上传元素
+            async def click_by_text():
+                page = self.browser.main_page
+                js_result = await page.evaluate(_VIDEO_UPLOAD_FIND_JS, True)
+                logger.debug("JavaScript查找视频上传元素结果: %s", js_result)
+                return bool(js_result.get('found'))
             
-        except Exception as e:
-            print(f"上传视频过程中出错: {str(e)}") 
\ No newline at end of file
+            await self._chooser_upload(click_by_text, files, kind, stats)
+            
+        except PlaywrightError as e:
+            logger.warning("上传%s过程中出错: %s", label, e)
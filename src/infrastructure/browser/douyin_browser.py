@@ -2,24 +2,185 @@
 抖音浏览器管理器
 """
 import asyncio
+import json
 import os
+import shutil
+import weakref
 from pathlib import Path
 from datetime import datetime
+import psutil
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from src.core.logging.logger import logger
 from src.core.config.config import config
 
+# 记录本次启动的浏览器进程（PID 和创建时间）的文件名，位于抖音数据目录下
+_PID_FILE_NAME = "browser.pid"
+
+# 关闭浏览器时每一步的最长等待时间（秒），超时后交给后续的强制结束进程步骤
+_CLOSE_STEP_TIMEOUT = 5.0
+
+# Chromium 在用户数据目录中创建的单实例锁文件
+_SINGLETON_LOCK_NAMES = frozenset(("SingletonLock", "SingletonSocket", "SingletonCookie"))
+
+# 记录上次命中的登录按钮选择器的文件名，位于抖音数据目录下
+_SELECTOR_CACHE_NAME = "selectors.json"
+
+# 登录按钮的候选规则：(CSS选择器, 是否要求元素文字恰为“登录”)，按优先级排列
+_LOGIN_BUTTON_RULES = (
+    ('[data-e2e="login-button"]', False),
+    ('.login-button', False),
+    ('button, a', True),
+    ('span, div', True),
+)
+
+# 在页面内按规则顺序查找第一个可见的登录按钮，返回元素和命中的选择器；都未找到时返回 null 继续等待
+_LOGIN_BUTTON_JS = """
+(rules) => {
+    for (const [selector, needText] of rules) {
+        for (const element of document.querySelectorAll(selector)) {
+            if (needText && (element.innerText || '').trim() !== '登录') {
+                continue;
+            }
+            if (element.getClientRects().length) {
+                return {element, selector};
+            }
+        }
+    }
+    return null;
+}
+"""
+
+# 等待登录按钮出现的最长时间（毫秒）
+_LOGIN_PROBE_TIMEOUT = 5000
+
+# 登录完成判定：页面上既没有登录按钮，也没有文字为“登录”的链接/按钮
+_LOGIN_DONE_JS = """
+() => !document.querySelector('[data-e2e="login-button"]')
+    && !Array.from(document.querySelectorAll('a, button, span')).some(el => el.innerText.trim() === '登录')
+"""
+
+# 页面端检查登录是否完成的间隔（毫秒）
+_LOGIN_DONE_POLL_MS = 500
+
+
+def _load_recorded_procs(pid_file: Path) -> list:
+    """从PID文件恢复记录的浏览器进程（创建时间不一致的视为PID已被复用，跳过）
+
+    Args:
+        pid_file: PID文件路径
+
+    Returns:
+        仍在运行的 psutil.Process 列表
+    """
+    procs = []
+    try:
+        lines = pid_file.read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return procs
+    for line in lines:
+        try:
+            pid, create_time = line.split()
+            proc = psutil.Process(int(pid))
+            if proc.create_time() == float(create_time):
+                procs.append(proc)
+        except (ValueError, psutil.Error):
+            pass
+    return procs
+
+
+def _terminate_procs(procs: list, timeout: float = 3):
+    """终止进程并等待退出（全部退出即返回），超时仍未退出的强制结束
+
+    Args:
+        procs: psutil.Process 列表
+        timeout: 等待退出的最长时间（秒）
+    """
+    procs = [proc for proc in procs if proc.is_running()]
+    for proc in procs:
+        try:
+            logger.info(f"终止剩余的抖音浏览器进程: PID {proc.pid}")
+            proc.terminate()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    if not procs:
+        return
+    _, alive = psutil.wait_procs(procs, timeout=timeout)
+    if not alive:
+        return
+    for proc in alive:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(alive, timeout=1)
+
+
+def _remove_singleton_locks(data_dir: Path):
+    """一次遍历数据目录，删除其中的单实例锁文件
+
+    目录项直接按名称过滤，类型取自目录项本身，不对每个锁文件单独stat；
+    SingletonLock是符号链接，目标不存在时同样会被删除。
+
+    Args:
+        data_dir: 浏览器用户数据目录
+    """
+    try:
+        with os.scandir(data_dir) as entries:
+            locks = [entry for entry in entries if entry.name in _SINGLETON_LOCK_NAMES]
+    except FileNotFoundError:
+        return
+    for entry in locks:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+            logger.info(f"清理了抖音{entry.name}文件")
+        except FileNotFoundError:
+            pass
+
+
+def _force_cleanup(data_dir: Path, pid_file: Path, procs=()):
+    """强制结束浏览器进程并清理锁文件（同步执行，不依赖事件循环）
+
+    先终止给定的进程，没有给定时读取PID文件回收记录的进程；进程退出后再删除单实例锁文件。
+    关闭浏览器时放到线程池执行，同时作为管理器的终结器在对象被回收或解释器退出时调用，
+    只接收路径和进程句柄而不引用管理器本身。
+
+    Args:
+        data_dir: 浏览器用户数据目录
+        pid_file: PID文件路径
+        procs: 已知的浏览器进程（psutil.Process）
+    """
+    try:
+        _terminate_procs(list(procs) or _load_recorded_procs(pid_file))
+        pid_file.unlink(missing_ok=True)
+    except Exception as e:
+        logger.warning(f"强制清理抖音浏览器进程时出错: {str(e)}")
+
+    try:
+        _remove_singleton_locks(data_dir)
+    except Exception as e:
+        logger.warning(f"清理抖音锁文件时出错: {str(e)}")
+
 
 class DouyinBrowserManager:
     """抖音浏览器管理器"""
 
     def __init__(self):
         self.playwright = None
-        self.browser = None
         self.context = None
         self.main_page = None
         self.is_logged_in = False
         self.data_dir = config.paths.browser_data_dir / "douyin_data"
+        self.pid_file = self.data_dir / _PID_FILE_NAME
+        self.selector_cache_file = self.data_dir / _SELECTOR_CACHE_NAME
+        self._browser_procs = {}  # 本次启动的Chromium进程：PID -> psutil.Process
+        self._start_lock = asyncio.Lock()  # 串行化浏览器的检查与启动，避免并发调用各自启动一个浏览器
+
+        # 管理器被回收或解释器退出时兜底终止记录的浏览器进程（此时事件循环通常已关闭，只能同步清理）
+        self._finalizer = weakref.finalize(self, _force_cleanup, self.data_dir, self.pid_file)
 
         # 引入登录状态管理器（延迟初始化）
         self._login_manager = None
@@ -39,27 +200,29 @@ class DouyinBrowserManager:
             force_check: 是否强制重新检查和启动
         """
         try:
-            # 如果强制检查或浏览器未启动，重新启动
-            if force_check or not self.browser or not self.context or not self.main_page:
-                await self.start_browser()
-                return True
+            # 持锁检查和启动：等锁期间其他调用者可能已经启动好浏览器，拿到锁后按最新状态判断
+            async with self._start_lock:
+                # 如果强制检查或浏览器未启动，重新启动
+                if force_check or not self.context or not self.main_page:
+                    await self.start_browser()
+                    return True
+
+                # 检查浏览器是否仍然有效
+                try:
+                    if hasattr(self.main_page, 'is_closed'):
+                        # 注意：is_closed 是属性，不是方法
+                        is_closed = self.main_page.is_closed()
+                        if is_closed:
+                            logger.warning("抖音浏览器页面已关闭，重新启动")
+                            await self.start_browser()
+                            return True
+                except Exception as e:
+                    logger.warning(f"检查抖音浏览器状态失败: {str(e)}，重新启动")
+                    await self.start_browser()
+                    return True
 
-            # 检查浏览器是否仍然有效
-            try:
-                if hasattr(self.main_page, 'is_closed'):
-                    # 注意：is_closed 是属性，不是方法
-                    is_closed = self.main_page.is_closed()
-                    if is_closed:
-                        logger.warning("抖音浏览器页面已关闭，重新启动")
-                        await self.start_browser()
-                        return True
-            except Exception as e:
-                logger.warning(f"检查抖音浏览器状态失败: {str(e)}，重新启动")
-                await self.start_browser()
                 return True
 
-            return True
-
         except Exception as e:
             logger.error(f"确保抖音浏览器启动失败: {str(e)}")
             return False
@@ -76,26 +239,23 @@ class DouyinBrowserManager:
             # 启动 Playwright
             self.playwright = await async_playwright().start()
 
-            # 启动浏览器
-            self.browser = await self.playwright.chromium.launch(
+            # 启动浏览器并使用持久化上下文：复用数据目录中的用户配置、Cookie和缓存，重启后无需重新登录
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=str(self.data_dir),
                 headless=False,  # 显示浏览器窗口
                 args=[
                     '--no-sandbox',
                     '--disable-blink-features=AutomationControlled',
                     '--disable-web-security',
                     '--disable-features=VizDisplayCompositor'
-                ]
-            )
-
-            # 创建浏览器上下文（使用持久化上下文）
-            self.context = await self.browser.new_context(
+                ],
                 viewport={'width': 1280, 'height': 720},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                storage_state=None  # 可以后续加载保存的状态
+                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             )
+            self._record_browser_pids()
 
-            # 创建主页面
-            self.main_page = await self.context.new_page()
+            # 复用浏览器启动时自带的标签页作为主页面
+            self.main_page = self.context.pages[0] if self.context.pages else await self.context.new_page()
 
             logger.info("抖音浏览器启动成功")
             return True
@@ -104,17 +264,21 @@ class DouyinBrowserManager:
             logger.error(f"启动抖音浏览器失败: {str(e)}")
             return False
 
-    async def goto(self, url: str, wait_time: int = 3):
-        """访问指定URL
+    async def goto(self, url: str, wait_time: int = 3, wait_for: str = 'networkidle'):
+        """访问指定URL，页面达到指定加载状态即返回
 
         Args:
             url: 目标URL
-            wait_time: 等待时间（秒）
+            wait_time: 等待页面加载的最长时间（秒），超时后不报错直接继续
+            wait_for: 等待的加载状态（'networkidle'、'load' 或 'domcontentloaded'）
         """
         try:
             await self.ensure_browser()
             await self.main_page.goto(url, timeout=60000)
-            await asyncio.sleep(wait_time)
+            try:
+                await self.main_page.wait_for_load_state(wait_for, timeout=wait_time * 1000)
+            except PlaywrightTimeoutError:
+                logger.debug(f"等待抖音页面{wait_for}超时（{wait_time}秒），继续执行: {url}")
             logger.info(f"已访问抖音页面: {url}")
 
         except Exception as e:
@@ -123,11 +287,6 @@ class DouyinBrowserManager:
 
     async def close_browser(self):
         """关闭浏览器并清理资源"""
-        import os
-        import psutil
-        import subprocess
-        import shutil
-
         try:
             logger.info("执行抖音浏览器关闭")
 
@@ -135,88 +294,43 @@ class DouyinBrowserManager:
             if hasattr(self, 'is_logged_in') and self.is_logged_in:
                 try:
                     if hasattr(self, 'login_manager'):
-                        await self.login_manager.save_login_state({
+                        await asyncio.shield(self.login_manager.save_login_state({
                             "close_reason": "browser_close",
                             "close_time": datetime.now().isoformat()
-                        })
+                        }))
                 except Exception as e:
                     logger.warning(f"保存抖音登录状态失败: {str(e)}")
 
-            # 2. 尝试正常关闭页面
-            if self.main_page:
-                try:
-                    await self.main_page.close()
-                    logger.info("抖音主页面正常关闭")
-                except Exception as e:
-                    logger.warning(f"关闭抖音主页面时出错: {str(e)}")
-                finally:
-                    self.main_page = None
-
-            # 3. 关闭浏览器上下文
+            # 2. 关闭浏览器上下文（持久化上下文关闭时会一并关闭页面和浏览器进程）
             if self.context:
                 try:
-                    await self.context.close()
+                    await asyncio.wait_for(self.context.close(), _CLOSE_STEP_TIMEOUT)
                     logger.info("抖音浏览器上下文正常关闭")
+                except asyncio.TimeoutError:
+                    logger.warning(f"关闭抖音浏览器上下文超时（{_CLOSE_STEP_TIMEOUT}秒），将强制结束进程")
                 except Exception as e:
                     logger.warning(f"关闭抖音浏览器上下文时出错: {str(e)}")
                 finally:
                     self.context = None
+                    self.main_page = None
 
-            # 4. 关闭浏览器实例
-            if self.browser:
-                try:
-                    await self.browser.close()
-                    logger.info("抖音浏览器实例正常关闭")
-                except Exception as e:
-                    logger.warning(f"关闭抖音浏览器实例时出错: {str(e)}")
-                finally:
-                    self.browser = None
-
-            # 5. 停止Playwright实例
+            # 3. 停止Playwright实例
             if self.playwright:
                 try:
-                    await self.playwright.stop()
+                    await asyncio.wait_for(self.playwright.stop(), _CLOSE_STEP_TIMEOUT)
                     logger.info("抖音Playwright实例停止")
+                except asyncio.TimeoutError:
+                    logger.warning(f"停止抖音Playwright实例超时（{_CLOSE_STEP_TIMEOUT}秒）")
                 except Exception as e:
                     logger.warning(f"停止抖音Playwright实例时出错: {str(e)}")
                 finally:
                     self.playwright = None
 
-            # 6. 强制清理浏览器进程（确保完全释放）
-            try:
-                # 查找并终止所有与douyin相关的Chromium进程
-                for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                    try:
-                        cmdline = proc.info.get('cmdline', [])
-                        cmdline_str = ' '.join(cmdline) if cmdline else ''
-
-                        if ('chromium' in proc.info['name'].lower() or 'chrome' in proc.info['name'].lower()) and 'douyin_data' in cmdline_str:
-                            logger.info(f"终止剩余的抖音浏览器进程: PID {proc.info['pid']}")
-                            psutil.Process(proc.info['pid']).terminate()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        pass
-
-                # 使用系统命令进行最终清理
-                if os.name == 'posix':  # macOS/Linux
-                    subprocess.run(['pkill', '-f', 'chromium.*douyin_data'], stderr=subprocess.PIPE)
-                elif os.name == 'nt':   # Windows
-                    subprocess.run(['taskkill', '/f', '/im', 'chrome.exe'], stderr=subprocess.PIPE)
-            except Exception as e:
-                logger.warning(f"强制清理抖音浏览器进程时出错: {str(e)}")
-
-            # 7. 清理锁文件
-            try:
-                lock_files = ["SingletonLock", "SingletonSocket", "SingletonCookie"]
-                for lock_file in lock_files:
-                    lock_path = self.data_dir / lock_file
-                    if lock_path.exists():
-                        if lock_path.is_file():
-                            lock_path.unlink()
-                        elif lock_path.is_dir():
-                            shutil.rmtree(lock_path)
-                        logger.info(f"清理了抖音{lock_file}文件")
-            except Exception as e:
-                logger.warning(f"清理抖音锁文件时出错: {str(e)}")
+            # 4-5. 强制清理浏览器进程并清理锁文件（确保完全释放），整体放到线程池执行，不阻塞事件循环；
+            # 只终止本次启动时记录的浏览器进程，内存中没有记录时（如进程重启后）读取PID文件回收上次遗留的进程
+            procs = list(self._browser_procs.values())
+            self._browser_procs = {}
+            await asyncio.to_thread(_force_cleanup, self.data_dir, self.pid_file, procs)
 
             # 重置状态
             self.is_logged_in = False
@@ -231,30 +345,87 @@ class DouyinBrowserManager:
             # 即使关闭失败，也要重置状态
             self.main_page = None
             self.context = None
-            self.browser = None
             self.playwright = None
             self.is_logged_in = False
 
+    def _record_browser_pids(self):
+        """缓存Playwright驱动进程下的Chromium进程句柄，并写入PID文件供下次启动时回收
+
+        驱动PID取自Playwright内部属性，不可用时不记录。
+        """
+        self._browser_procs = {}
+        try:
+            driver_pid = self.playwright._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            return
+        records = []
+        try:
+            for child in psutil.Process(driver_pid).children(recursive=True):
+                try:
+                    if 'chrom' in child.name().lower():
+                        self._browser_procs[child.pid] = child
+                        records.append(f"{child.pid} {child.create_time()!r}")
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+            self.pid_file.write_text("\n".join(records), encoding='utf-8')
+        except (psutil.Error, OSError) as e:
+            logger.debug("记录抖音浏览器进程失败: %s", e)
+
+    async def _find_login_button(self):
+        """查找登录按钮：所有候选规则在页面内一次等待中同时检查，上次命中的规则优先
+
+        Returns:
+            登录按钮的 ElementHandle，未找到时返回 None
+        """
+        cached = await asyncio.to_thread(self._read_login_selector)
+        rules = sorted(_LOGIN_BUTTON_RULES, key=lambda rule: rule[0] != cached)
+        try:
+            found = await self.main_page.wait_for_function(
+                _LOGIN_BUTTON_JS, arg=[list(rule) for rule in rules], timeout=_LOGIN_PROBE_TIMEOUT
+            )
+        except PlaywrightTimeoutError:
+            return None
+
+        selector = await (await found.get_property('selector')).json_value()
+        logger.info(f"找到登录按钮，使用选择器: {selector}")
+        if selector != cached:
+            await asyncio.to_thread(self._write_login_selector, selector)
+        return (await found.get_property('element')).as_element()
+
+    def _read_login_selector(self):
+        """读取上次命中的登录按钮选择器，没有记录时返回 None"""
+        try:
+            with open(self.selector_cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("login_selector")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _write_login_selector(self, selector: str):
+        """记录命中的登录按钮选择器"""
+        try:
+            with open(self.selector_cache_file, 'w', encoding='utf-8') as f:
+                json.dump({"login_selector": selector}, f, ensure_ascii=False)
+        except OSError as e:
+            logger.debug("保存登录按钮选择器失败: %s", e)
+
     async def save_cookies(self, file_path: str):
-        """保存 cookies"""
+        """保存 cookies（序列化和文件写入放到线程池，避免阻塞事件循环）"""
         try:
             if self.context:
                 cookies = await self.context.cookies()
-                import json
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(cookies, f, ensure_ascii=False, indent=2)
+                await asyncio.to_thread(self._write_cookies_file, file_path, cookies)
                 logger.info(f"抖音 cookies 已保存到: {file_path}")
 
         except Exception as e:
             logger.error(f"保存抖音 cookies 失败: {str(e)}")
 
     async def load_cookies(self, file_path: str):
-        """加载 cookies"""
+        """加载 cookies（文件读取和反序列化放到线程池，避免阻塞事件循环）"""
         try:
-            if self.context and os.path.exists(file_path):
-                import json
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    cookies = json.load(f)
+            if self.context:
+                cookies = await asyncio.to_thread(self._read_cookies_file, file_path)
+                if cookies is None:
+                    return False
                 await self.context.add_cookies(cookies)
                 logger.info(f"抖音 cookies 已加载: {file_path}")
                 return True
@@ -264,6 +435,34 @@ class DouyinBrowserManager:
 
         return False
 
+    @staticmethod
+    def _write_cookies_file(file_path: str, cookies: list):
+        """把 cookies 写入磁盘
+
+        Args:
+            file_path: 文件路径
+            cookies: Playwright 返回的 cookie 列表
+        """
+        # 紧凑格式：不缩进、不留分隔空格，cookie 文件只供程序读取
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def _read_cookies_file(file_path: str):
+        """从磁盘读取 cookies
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            cookie 列表，文件不存在时返回 None
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
     async def login(self) -> str:
         """智能登录抖音账号
 
@@ -304,24 +503,7 @@ class DouyinBrowserManager:
                 # 等待页面完全加载
                 await asyncio.sleep(3)
 
-                # 尝试多种登录按钮选择器
-                login_selectors = [
-                    'text="登录"',
-                    '[data-e2e="login-button"]',
-                    '.login-button',
-                    'button:has-text("登录")',
-                    'a:has-text("登录")'
-                ]
-
-                login_element = None
-                for selector in login_selectors:
-                    try:
-                        login_element = await self.main_page.wait_for_selector(selector, timeout=5000)
-                        if login_element:
-                            logger.info(f"找到登录按钮，使用选择器: {selector}")
-                            break
-                    except Exception:
-                        continue
+                login_element = await self._find_login_button()
 
                 if login_element:
                     # 滚动到元素位置
@@ -340,57 +522,42 @@ class DouyinBrowserManager:
                     print(message)
                     logger.info("等待用户登录抖音")
 
-                    # 等待用户登录成功
+                    # 等待用户登录成功：登录入口从页面上消失即视为登录完成，
+                    # 判定在页面内定时执行，不在Python侧轮询；页面关闭时等待会立即以错误结束
                     max_wait_time = 180  # 等待3分钟
-                    wait_interval = 5
-                    waited_time = 0
-
-                    while waited_time < max_wait_time:
-                        try:
-                            # 检查页面是否仍然有效
-                            if hasattr(self.main_page, 'is_closed'):
-                                # 注意：is_closed 是属性，不是方法
-                                is_closed = self.main_page.is_closed()
-                                if is_closed:
-                                    logger.error("页面在等待登录过程中被关闭")
-                                    return "页面已关闭，请重新尝试登录"
-
-                            # 检查是否已登录成功
-                            still_login = await self.main_page.query_selector_all('text="登录"')
-                            if not still_login:
-                                self.is_logged_in = True
-                                await asyncio.sleep(2)  # 等待页面加载
-
-                                # 保存登录状态
-                                await self.login_manager.save_login_state({
-                                    "login_method": "manual_login",
-                                    "login_time": datetime.now().isoformat(),
-                                    "platform": "douyin"
-                                })
-
-                                logger.info("用户抖音登录成功")
-                                return "抖音登录成功！"
-                        except Exception as e:
-                            logger.warning(f"检查抖音登录状态时出错: {str(e)}")
-                            # 如果查询失败，可能是页面问题，尝试恢复
-                            try:
-                                await self.ensure_browser(force_check=True)
-                            except Exception:
-                                pass
-
-                        # 继续等待
-                        await asyncio.sleep(wait_interval)
-                        waited_time += wait_interval
-
-                    return "抖音登录等待超时。请重试或检查网络连接。"
+                    try:
+                        await self.main_page.wait_for_function(
+                            _LOGIN_DONE_JS, polling=_LOGIN_DONE_POLL_MS, timeout=max_wait_time * 1000
+                        )
+                    except PlaywrightTimeoutError:
+                        return "抖音登录等待超时。请重试或检查网络连接。"
+                    except PlaywrightError as e:
+                        if self.main_page.is_closed():
+                            logger.error("页面在等待登录过程中被关闭")
+                            return "页面已关闭，请重新尝试登录"
+                        logger.warning(f"检查抖音登录状态时出错: {str(e)}")
+                        return f"等待抖音登录时出错: {str(e)}"
+
+                    self.is_logged_in = True
+                    await asyncio.sleep(2)  # 等待页面加载
+
+                    # 保存登录状态
+                    await asyncio.shield(self.login_manager.save_login_state({
+                        "login_method": "manual_login",
+                        "login_time": datetime.now().isoformat(),
+                        "platform": "douyin"
+                    }))
+
+                    logger.info("用户抖音登录成功")
+                    return "抖音登录成功！"
                 else:
                     # 没有找到登录按钮，可能已经登录
                     self.is_logged_in = True
-                    await self.login_manager.save_login_state({
+                    await asyncio.shield(self.login_manager.save_login_state({
                         "login_method": "already_logged_in",
                         "login_time": datetime.now().isoformat(),
                         "platform": "douyin"
-                    })
+                    }))
                     return "已登录抖音账号"
 
             except Exception as e:
@@ -400,11 +567,3 @@ class DouyinBrowserManager:
         except Exception as e:
             logger.error(f"抖音登录过程出错: {str(e)}")
             return f"登录过程出错: {str(e)}"
-
-    def __del__(self):
-        """析构函数"""
-        try:
-            if self.browser:
-                asyncio.create_task(self.close_browser())
-        except Exception:
-            pass
@@ -2,7 +2,10 @@
 抖音登录状态管理器
 """
 import json
+import os
+import tempfile
 import time
+import random
 import asyncio
 from pathlib import Path
 from typing import Dict, Optional, Any
@@ -10,6 +13,17 @@ from datetime import datetime, timedelta
 from src.core.config.config import config
 from src.core.logging.logger import logger
 
+# 等待用户登录时的轮询退避参数（秒）：首轮约2秒，每轮按系数增长并加入±25%抖动，上限15秒
+_LOGIN_POLL_BASE = 2.0
+_LOGIN_POLL_FACTOR = 1.3
+_LOGIN_POLL_CAP = 15.0
+
+
+def _login_poll_delay(attempt: int) -> float:
+    """计算第 attempt 轮（从0开始）登录轮询前的等待时间"""
+    jitter = 0.75 + 0.5 * random.random()
+    return min(_LOGIN_POLL_CAP, _LOGIN_POLL_BASE * (_LOGIN_POLL_FACTOR ** attempt) * jitter)
+
 
 class DouyinLoginManager:
     """抖音登录状态管理器"""
@@ -48,8 +62,7 @@ class DouyinLoginManager:
                 "login_info": login_info or {}
             }
 
-            with open(self.login_state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, indent=2, ensure_ascii=False)
+            self._write_state_file(state_data)
 
             logger.info("抖音登录状态已保存")
 
@@ -174,8 +187,7 @@ class DouyinLoginManager:
 
             # 安全地检查是否有登录按钮
             try:
-                login_elements = await self.browser.main_page.query_selector_all('text="登录"')
-                is_logged_in = len(login_elements) == 0
+                is_logged_in = await self.browser.main_page.locator('text="登录"').count() == 0
             except Exception as e:
                 logger.error(f"查询抖音登录元素失败: {str(e)}")
                 # 如果查询失败，假设未登录
@@ -291,12 +303,28 @@ class DouyinLoginManager:
 
                 state_data["last_activity"] = datetime.now().isoformat()
 
-                with open(self.login_state_file, 'w', encoding='utf-8') as f:
-                    json.dump(state_data, f, indent=2, ensure_ascii=False)
+                self._write_state_file(state_data)
 
         except Exception as e:
             logger.debug(f"更新抖音活动时间失败: {str(e)}")
 
+    def _write_state_file(self, state_data: Dict[str, Any]):
+        """原子地写入登录状态文件：先写同目录下的临时文件，再整体替换，中途失败不会留下半截文件
+
+        Args:
+            state_data: 登录状态数据
+        """
+        tmp = tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=self.login_state_file.parent, suffix='.tmp', delete=False
+        )
+        try:
+            with tmp:
+                json.dump(state_data, tmp, indent=2, ensure_ascii=False)
+            os.replace(tmp.name, self.login_state_file)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
     async def login(self) -> str:
         """智能登录，优先尝试恢复，失败后引导用户登录
 
@@ -342,8 +370,8 @@ class DouyinLoginManager:
 
                 # 等待用户登录成功
                 max_wait_time = 180  # 等待3分钟
-                wait_interval = 5
                 waited_time = 0
+                attempt = 0
 
                 while waited_time < max_wait_time:
                     try:
@@ -365,11 +393,11 @@ class DouyinLoginManager:
                             await asyncio.sleep(2)  # 等待页面加载
 
                             # 保存登录状态
-                            await self.save_login_state({
+                            await asyncio.shield(self.save_login_state({
                                 "login_method": "manual_scan",
                                 "login_time": datetime.now().isoformat(),
                                 "platform": "douyin"
-                            })
+                            }))
                             self._session_start_time = datetime.now()
 
                             logger.info("用户抖音登录成功")
@@ -382,19 +410,21 @@ class DouyinLoginManager:
                         except Exception:
                             pass
 
-                    # 继续等待
-                    await asyncio.sleep(wait_interval)
-                    waited_time += wait_interval
+                    # 继续等待：前几轮间隔短以尽快发现登录完成，之后逐渐放缓
+                    delay = min(_login_poll_delay(attempt), max_wait_time - waited_time)
+                    await asyncio.sleep(delay)
+                    waited_time += delay
+                    attempt += 1
 
                 return "抖音登录等待超时。请重试或检查网络连接。"
             else:
                 # 没有找到登录元素，可能已经登录
                 self.browser.is_logged_in = True
-                await self.save_login_state({
+                await asyncio.shield(self.save_login_state({
                     "login_method": "already_logged_in",
                     "login_time": datetime.now().isoformat(),
                     "platform": "douyin"
-                })
+                }))
                 return "已登录抖音账号"
 
         except Exception as e:
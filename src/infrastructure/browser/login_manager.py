@@ -154,8 +154,7 @@ class LoginStateManager:
 
             # 安全地检查是否有登录按钮
             try:
-                login_elements = await self.browser.main_page.query_selector_all('text="登录"')
-                is_logged_in = len(login_elements) == 0
+                is_logged_in = await self.browser.main_page.locator('text="登录"').count() == 0
             except Exception as e:
                 logger.error(f"查询登录元素失败: {str(e)}")
                 # 如果查询失败，假设未登录
@@ -253,9 +252,9 @@ class LoginStateManager:
 
             # 安全地查找登录按钮并点击
             try:
-                login_elements = await self.browser.main_page.query_selector_all('text="登录"')
-                if login_elements:
-                    await login_elements[0].click()
+                login_button = self.browser.main_page.locator('text="登录"')
+                if await login_button.count() > 0:
+                    await login_button.first.click()
 
                     # 提示用户手动登录
                     message = "请在打开的浏览器窗口中完成登录操作。登录成功后，系统将自动继续。"
@@ -277,7 +276,7 @@ class LoginStateManager:
                                     return "页面已关闭，请重新尝试登录"
 
                             # 检查是否已登录成功
-                            still_login = await self.browser.main_page.query_selector_all('text="登录"')
+                            still_login = await self.browser.main_page.locator('text="登录"').count() > 0
                             if not still_login:
                                 self.browser.is_logged_in = True
                                 await asyncio.sleep(2)  # 等待页面加载
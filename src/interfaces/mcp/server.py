@@ -227,6 +227,29 @@ async def publish_note_redbook(title: str, content: str, media_paths: list, topi
         logger.error(error_msg)
         return error_msg
 
+@mcp.tool()
+async def publish_notes_redbook(notes: list, concurrency: int = 1):
+    """批量发布小红书图文或视频笔记
+
+    Args:
+        notes: 笔记列表，每项包含 title、content、media_paths 以及可选的 topics
+        concurrency: 同时发布的笔记数（大于1时在多个标签页中并发发布）
+
+    Returns:
+        str: 每篇笔记的发布结果
+    """
+    try:
+        results = await publish_manager.publish_notes(notes, concurrency)
+        logger.info(f"批量发布小红书笔记完成: 共 {len(notes)} 篇")
+        return "\n".join(
+            f"{i}. {note.get('title', '')}: {result}"
+            for i, (note, result) in enumerate(zip(notes, results), 1)
+        )
+    except Exception as e:
+        error_msg = f"批量发布小红书笔记失败: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
 @mcp.tool()
 async def publish_douyin_content(
     title: str,
@@ -318,20 +341,19 @@ def main():
             import os
             import shutil
             import psutil
-            import subprocess
             import time
 
             logger.info("执行启动前清理...")
 
             # 1. 清理可能存在的浏览器进程
             killed_processes = 0
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            user_data_dir_arg = f"--user-data-dir={config.paths.browser_data_dir}"
+            for proc in psutil.process_iter(['name']):
                 try:
-                    cmdline = proc.info.get('cmdline', [])
-                    cmdline_str = ' '.join(cmdline) if cmdline else ''
-
-                    # 匹配与当前项目相关的浏览器进程
-                    if ('chromium' in proc.info['name'].lower() or 'chrome' in proc.info['name'].lower()) and 'redbook_mcp' in cmdline_str:
+                    # 先按进程名筛出Chromium，再逐项比较命令行参数，只匹配使用当前项目浏览器数据目录的进程
+                    if 'chrom' not in (proc.info['name'] or '').lower():
+                        continue
+                    if user_data_dir_arg in proc.cmdline():
                         proc.terminate()
                         killed_processes += 1
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
@@ -342,13 +364,7 @@ def main():
                 # 等待进程完全终止
                 time.sleep(1)
 
-            # 2. 系统级清理命令
-            if os.name == 'posix':  # macOS/Linux
-                subprocess.run(['pkill', '-f', 'chromium.*redbook_mcp'], stderr=subprocess.PIPE)
-            elif os.name == 'nt':   # Windows
-                subprocess.run(['taskkill', '/f', '/im', 'chrome.exe'], stderr=subprocess.PIPE)
-
-            # 3. 清理锁文件
+            # 2. 清理锁文件
             browser_data_dir = config.paths.browser_data_dir
             lock_files = ["SingletonLock", "SingletonSocket", "SingletonCookie"]
             for lock_file in lock_files:
@@ -0,0 +1,39 @@
+"""
+BrowserManager 启动与登录恢复流程测试
+"""
+import asyncio
+from types import SimpleNamespace
+
+from src.infrastructure.browser.browser import BrowserManager
+
+
+def _cold_manager():
+    """构造一个浏览器启动被替换为内存桩的 BrowserManager"""
+    manager = BrowserManager()
+
+    async def fake_start_browser():
+        manager.playwright_instance = object()
+        manager.browser_context = SimpleNamespace(pages=[])
+        manager.main_page = SimpleNamespace(is_closed=lambda: False, url="about:blank")
+
+    async def fake_load_login_state():
+        return {"browser_data_dir": ""}
+
+    async def fake_check_login_status(force_check=False):
+        return True
+
+    manager._start_browser = fake_start_browser
+    manager.login_manager.load_login_state = fake_load_login_state
+    manager.login_manager.check_login_status = fake_check_login_status
+    return manager
+
+
+def test_ensure_browser_cold_start_restores_login_without_deadlock():
+    """冷启动时恢复登录会再次调用 ensure_browser，不能因健康检查锁而挂起"""
+    manager = _cold_manager()
+
+    healthy = asyncio.run(asyncio.wait_for(manager.ensure_browser(), timeout=5))
+
+    assert healthy is True
+    assert manager._login_restore_pending is False
+    assert not manager._health_lock.locked()